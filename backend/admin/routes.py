@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi import UploadFile, File, Form, Request
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import func, or_
 from typing import List, Dict, Any, Optional
 from pydantic import BaseModel
@@ -10,7 +11,7 @@ from datetime import datetime, timezone
 import glob
 from pathlib import Path
 
-from database import get_db
+from database import get_async_db, get_db
 from models import Character, Chat, ChatMessage, User, UserToken, TokenTransaction, Notification
 from schemas import (
     Character as CharacterSchema, 
@@ -146,7 +147,7 @@ async def create_admin_character(
 @router.get("/characters/{character_id}/gallery")
 async def get_admin_character_gallery(
     character_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_user: TokenPayload = Depends(get_current_admin)
 ):
     """Get character gallery data (admin context)"""
@@ -165,7 +166,7 @@ async def admin_upload_gallery_image(
     category: str = Form("general"),
     is_primary: bool = Form(False),
     alt_text: str = Form(None),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_user: TokenPayload = Depends(get_current_admin)
 ):
     """Upload a gallery image (admin context, uses admin token)"""
@@ -209,7 +210,7 @@ async def admin_upload_gallery_image(
 async def admin_set_primary_gallery_image(
     character_id: int,
     image_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_user: TokenPayload = Depends(get_current_admin)
 ):
     """Set primary gallery image (admin context)"""
@@ -228,7 +229,7 @@ async def admin_set_primary_gallery_image(
 async def admin_delete_gallery_image(
     character_id: int,
     image_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_user: TokenPayload = Depends(get_current_admin)
 ):
     """Delete a gallery image (admin context, soft delete)"""
@@ -247,7 +248,7 @@ async def admin_delete_gallery_image(
 async def admin_reorder_gallery_images(
     character_id: int,
     image_order: List[Dict[str, int]],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin_user: TokenPayload = Depends(get_current_admin)
 ):
     """Reorder gallery images (admin context)"""
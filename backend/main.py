@@ -286,6 +286,9 @@ async def startup_event():
 async def shutdown_event():
     """Clean up resources on shutdown"""
     from tasks.scheduled_tasks import stop_scheduler
+    from backend.services.ai_model_manager import shutdown_ai_model_manager
+    from backend.services.avatar_generation_service import shutdown_avatar_generation_service
+    from backend.services.upload_service import shutdown_thumbnail_pool
     import logging
 
     logger = logging.getLogger("shutdown")
@@ -296,6 +299,21 @@ async def shutdown_event():
     except Exception as e:
         logger.error(f"Error during shutdown: {e}")
 
+    try:
+        await shutdown_ai_model_manager()
+    except Exception as e:
+        logger.error(f"Error closing AI model manager: {e}")
+
+    try:
+        await shutdown_avatar_generation_service()
+    except Exception as e:
+        logger.error(f"Error closing avatar generation service: {e}")
+
+    try:
+        shutdown_thumbnail_pool()
+    except Exception as e:
+        logger.error(f"Error stopping thumbnail workers: {e}")
+
 @app.get("/api/health")
 async def health():
     """Health check endpoint"""
@@ -8,19 +8,20 @@ Routes:
 - GET /admin/ai-models/status - Get status of all AI models
 - POST /admin/ai-models/{model}/enable - Enable/disable specific AI model
 - POST /admin/ai-models/default - Set default AI model
+- POST /admin/ai-models/rate-limit - Set or clear the per-provider request budget
 - GET /admin/ai-models/settings - Get admin AI settings
 """
 
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import logging
 
 from database import get_db
 from auth.routes import get_current_user
 from backend.services.ai_model_manager import get_ai_model_manager, ModelProvider
 from models import User
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,9 @@ class ModelToggleRequest(BaseModel):
 class DefaultModelRequest(BaseModel):
     model: str
 
+class RateLimitRequest(BaseModel):
+    requests_per_minute: Optional[int] = Field(default=None, ge=0)
+
 class ModelStatusResponse(BaseModel):
     models: Dict[str, Dict[str, Any]]
     settings: Dict[str, Any]
@@ -133,6 +137,35 @@ async def set_default_ai_model(
         logger.error(f"Error setting default AI model to {request.model}: {e}")
         raise HTTPException(status_code=500, detail="Failed to set default AI model")
 
+@router.post("/ai-models/rate-limit")
+async def set_ai_rate_limit(
+    request: RateLimitRequest,
+    current_user: User = Depends(get_current_user)
+):
+    """Set the per-provider request budget; null or 0 disables it (Admin only)"""
+    if not is_admin(current_user):
+        raise HTTPException(status_code=403, detail="Admin access required")
+    
+    try:
+        ai_manager = await get_ai_model_manager()
+        success = ai_manager.set_rate_limit(request.requests_per_minute)
+        
+        if not success:
+            raise HTTPException(status_code=500, detail="Failed to set AI rate limit")
+        
+        logger.info(f"Admin {current_user.username} set AI rate limit to: {request.requests_per_minute}")
+        
+        return {
+            "message": "AI rate limit updated successfully",
+            "requests_per_minute": ai_manager.get_admin_settings()["requests_per_minute"]
+        }
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error setting AI rate limit to {request.requests_per_minute}: {e}")
+        raise HTTPException(status_code=500, detail="Failed to set AI rate limit")
+
 @router.get("/ai-models/settings")
 async def get_ai_admin_settings(
     current_user: User = Depends(get_current_user)
@@ -14,17 +14,18 @@ Routes:
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 from pydantic import BaseModel
 from slowapi import Limiter
 from slowapi.util import get_remote_address
 
-from database import get_db
+from database import get_async_db, get_db
 from auth.routes import get_current_user
 from backend.services.character_service import CharacterService, CharacterServiceError
 from backend.services.upload_service import UploadService
 from backend.services.character_gallery_service import CharacterGalleryService
-from backend.services.avatar_generation_service import AvatarGenerationService
+from backend.services.avatar_generation_service import get_avatar_generation_service
 from schemas import Character as CharacterSchema, CharacterCreate, CharacterUpdate, DefaultAvatar
 from models import User
 from routes.admin import is_admin
@@ -226,6 +227,7 @@ async def generate_character_avatar(
     character_name: str = Form(...),
     gender: str = Form("female"),
     style: str = Form("fantasy"),
+    regenerate: bool = Form(False),
     current_user: User = Depends(get_current_user)
 ):
     """
@@ -236,6 +238,7 @@ async def generate_character_avatar(
         character_name: Character name (used for filename)
         gender: Character gender (female/male/neutral)
         style: Art style (fantasy/realistic/anime/chinese/scifi/medieval)
+        regenerate: Skip the cached image for identical inputs and create a new variation
 
     Returns:
         Generated avatar URL
@@ -245,12 +248,13 @@ async def generate_character_avatar(
         - 20 generations per hour per IP
     """
     try:
-        service = AvatarGenerationService()
+        service = get_avatar_generation_service()
         success, avatar_url, error = await service.generate_avatar(
             prompt=prompt,
             character_name=character_name,
             gender=gender,
-            style=style
+            style=style,
+            use_cache=not regenerate,
         )
 
         if not success:
@@ -314,7 +318,7 @@ async def upload_character_avatar(
 @router.get("/{character_id}/gallery")
 async def get_character_gallery(
     character_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get character gallery data with all images"""
     try:
@@ -337,7 +341,7 @@ async def upload_gallery_image(
     is_primary: bool = Form(False),
     alt_text: str = Form(None),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Upload new image to character gallery (admin only)"""
     try:
@@ -391,7 +395,7 @@ async def set_primary_gallery_image(
     character_id: int,
     image_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Set a gallery image as the primary image (admin only)"""
     # Admin authorization required
@@ -418,7 +422,7 @@ async def delete_gallery_image(
     character_id: int,
     image_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete a gallery image (soft delete, admin only)"""
     # Admin authorization required
@@ -449,7 +453,7 @@ async def reorder_gallery_images(
     character_id: int,
     image_order: List[ImageOrderItem],  # Validated payload
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Reorder gallery images (admin only)"""
     # Admin authorization required
@@ -579,7 +583,7 @@ async def delete_character(
 @router.get("/gallery/stats")
 async def get_gallery_stats(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get overall gallery statistics (admin only)"""
     # Admin authorization required
@@ -19,20 +19,47 @@ Architecture:
 - PreferenceManager: Handles user and admin preferences
 """
 
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple, TypeVar, Any
 from enum import Enum
 from models import Character, ChatMessage, User
 from .ai_service_base import AIServiceBase, AIServiceError
 from .gemini_service_new import GeminiService
 from .grok_service import GrokService
 from .openai_service import OpenAIService
+from .rate_limiter import AsyncTokenBucket
 from config import settings
+import httpx
 import logging
 import asyncio
+import random
+import time
 from datetime import datetime, timedelta
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# How long a resolved model selection stays valid before it is recomputed
+SELECT_CACHE_TTL_SECONDS = 1.0
+
+# Reward weights per user_preferences["optimize_for"] goal
+PREFERENCE_WEIGHTS: Dict[str, Dict[str, float]] = {
+    "cost": {"quality": 0.4, "cost": 0.5, "latency": 0.1},
+    "speed": {"quality": 0.4, "cost": 0.1, "latency": 0.5},
+    "quality": {"quality": 0.8, "cost": 0.1, "latency": 0.1},
+    "balanced": {"quality": 0.5, "cost": 0.25, "latency": 0.25},
+}
+
+# Upper bounds on a single upstream call; a hung provider must not pin a worker
+DEFAULT_RESPONSE_TIMEOUT_SECONDS = 30.0
+OPENING_LINE_TIMEOUT_SECONDS = 10.0
+
+# Connection pool shared by the OpenAI-compatible provider clients (Grok, OpenAI)
+HTTP_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=30, keepalive_expiry=60.0)
+
+# Smoothing factor for observed per-provider latency (exponential moving average)
+LATENCY_EWMA_ALPHA = 0.2
+
 class ModelStatus(Enum):
     """AI Model availability status"""
     AVAILABLE = "available"
@@ -46,6 +73,26 @@ class ModelProvider(Enum):
     GROK = "grok"
     OPENAI = "openai"
 
+# Precomputed (provider, value) pairs for status snapshots and init logging
+_PROVIDERS: Tuple[Tuple[ModelProvider, str], ...] = tuple((p, p.value) for p in ModelProvider)
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Return True for transient upstream failures worth retrying on the same provider"""
+    seen = set()
+    current: Optional[BaseException] = exc
+    # Provider services wrap SDK errors in AIServiceError, so walk the exception chain
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, (asyncio.TimeoutError, ConnectionError)):
+            return True
+        status = getattr(current, "status_code", None) or getattr(current, "code", None)
+        if isinstance(status, int) and status in RETRYABLE_STATUS_CODES:
+            return True
+        current = current.__cause__ or current.__context__
+    return False
+
 class AIModelManager:
     """Central manager for multiple AI services"""
     
@@ -58,65 +105,101 @@ class AIModelManager:
             "enabled_models": [ModelProvider.GEMINI, ModelProvider.GROK, ModelProvider.OPENAI],
             "default_model": ModelProvider.GEMINI,
             "fallback_enabled": True,
-            "health_check_interval": 300  # 5 minutes
+            "health_check_interval": 300,  # 5 minutes
+            "max_concurrency": 10,  # in-flight upstream calls per provider
+            "requests_per_minute": None  # optional upstream call budget per provider; None or 0 disables pacing
         }
         self.logger = logging.getLogger(__name__)
+        self._initialized = False
+        # Bumped whenever admin routing settings change; part of the selection cache key
+        self._enabled_version = 0
+        self._select_cache: Dict[
+            Tuple[Optional[str], ModelProvider, Optional[str], int], Tuple[ModelProvider, float]
+        ] = {}
+        # Per-provider bulkheads so a burst of chats cannot trip upstream 429s
+        self._semaphores: Dict[ModelProvider, asyncio.Semaphore] = {}
+        self._rate_limiters: Dict[ModelProvider, AsyncTokenBucket] = {}
+        self._fallback_ring: Dict[ModelProvider, Tuple[ModelProvider, ...]] = {}
+        self._observed_latency_ms: Dict[ModelProvider, float] = {}
+        self._http: Optional[httpx.AsyncClient] = None
+        self._retry = {"max_attempts": 2, "base_ms": 100, "cap_ms": 1000}
+        self._timeouts: Dict[ModelProvider, float] = {
+            provider: DEFAULT_RESPONSE_TIMEOUT_SECONDS for provider, _ in _PROVIDERS
+        }
+        # Bumped on status and admin changes; together with live availability it
+        # keys the cached get_model_status() output
+        self._status_version = 0
+        self._status_cache: Optional[Tuple[Tuple[int, Tuple[bool, ...]], Dict[str, Dict[str, Any]]]] = None
+        self._rebuild_routing()
         
     async def initialize(self) -> bool:
-        """Initialize all AI services"""
+        """Initialize all AI services concurrently"""
         self.logger.info("🚀 Initializing AI Model Manager...")
         
-        success_count = 0
+        if self._http is None:
+            self._http = httpx.AsyncClient(limits=HTTP_POOL_LIMITS, timeout=httpx.Timeout(60.0, connect=10.0))
+        http_client = self._http
         
-        # Initialize Gemini service
-        try:
-            gemini_service = GeminiService(api_key=settings.gemini_api_key)
-            if await gemini_service.initialize():
-                self.services[ModelProvider.GEMINI] = gemini_service
-                self.service_status[ModelProvider.GEMINI] = ModelStatus.AVAILABLE
-                success_count += 1
-                self.logger.info("✅ Gemini service initialized")
-            else:
-                self.service_status[ModelProvider.GEMINI] = ModelStatus.UNAVAILABLE
-                self.logger.warning("⚠️ Gemini service failed to initialize")
-        except Exception as e:
-            self.service_status[ModelProvider.GEMINI] = ModelStatus.UNAVAILABLE
-            self.logger.error(f"❌ Gemini service initialization error: {e}")
+        results = await asyncio.gather(
+            self._init_one(
+                ModelProvider.GEMINI,
+                "Gemini",
+                lambda: GeminiService(api_key=settings.gemini_api_key),
+            ),
+            self._init_one(
+                ModelProvider.GROK,
+                "Grok",
+                lambda: GrokService(
+                    api_key=getattr(settings, 'grok_api_key', None),  # Optional for now
+                    http_client=http_client,
+                ),
+            ),
+            self._init_one(
+                ModelProvider.OPENAI,
+                "OpenAI",
+                lambda: OpenAIService(
+                    api_key=getattr(settings, "openai_api_key", None),
+                    http_client=http_client,
+                ),
+            ),
+            return_exceptions=True,
+        )
+        success_count = sum(1 for result in results if result is True)
+        self._initialized = success_count > 0
         
-        # Initialize Grok service
-        try:
-            grok_api_key = getattr(settings, 'grok_api_key', None)  # Optional for now
-            grok_service = GrokService(api_key=grok_api_key)
-            if await grok_service.initialize():
-                self.services[ModelProvider.GROK] = grok_service
-                self.service_status[ModelProvider.GROK] = ModelStatus.AVAILABLE
-                success_count += 1
-                self.logger.info("✅ Grok service initialized")
-            else:
-                self.service_status[ModelProvider.GROK] = ModelStatus.UNAVAILABLE
-                self.logger.warning("⚠️ Grok service failed to initialize")
-        except Exception as e:
-            self.service_status[ModelProvider.GROK] = ModelStatus.UNAVAILABLE
-            self.logger.error(f"❌ Grok service initialization error: {e}")
-
-        # Initialize OpenAI service
+        self.logger.info("✅ AI Model Manager initialized: %s/%s services available", success_count, len(_PROVIDERS))
+        return success_count > 0
+    
+    async def close(self) -> None:
+        """Release the shared HTTP connection pool"""
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+    
+    async def _init_one(
+        self,
+        provider: ModelProvider,
+        label: str,
+        factory: Callable[[], AIServiceBase],
+    ) -> bool:
+        """Construct and initialize a single provider service, recording its status"""
         try:
-            openai_api_key = getattr(settings, "openai_api_key", None)
-            openai_service = OpenAIService(api_key=openai_api_key)
-            if await openai_service.initialize():
-                self.services[ModelProvider.OPENAI] = openai_service
-                self.service_status[ModelProvider.OPENAI] = ModelStatus.AVAILABLE
-                success_count += 1
-                self.logger.info("✅ OpenAI service initialized")
-            else:
-                self.service_status[ModelProvider.OPENAI] = ModelStatus.UNAVAILABLE
-                self.logger.warning("⚠️ OpenAI service failed to initialize")
+            service = factory()
+            if await service.initialize():
+                self.services[provider] = service
+                self._semaphores[provider] = asyncio.Semaphore(self.admin_settings["max_concurrency"])
+                rate_limiter = self._make_rate_limiter()
+                if rate_limiter is not None:
+                    self._rate_limiters[provider] = rate_limiter
+                self._set_service_status(provider, ModelStatus.AVAILABLE)
+                self.logger.info("✅ %s service initialized", label)
+                return True
+            self._set_service_status(provider, ModelStatus.UNAVAILABLE)
+            self.logger.warning("⚠️ %s service failed to initialize", label)
         except Exception as e:
-            self.service_status[ModelProvider.OPENAI] = ModelStatus.UNAVAILABLE
-            self.logger.error(f"❌ OpenAI service initialization error: {e}")
-        
-        self.logger.info(f"✅ AI Model Manager initialized: {success_count}/{len(ModelProvider)} services available")
-        return success_count > 0
+            self._set_service_status(provider, ModelStatus.UNAVAILABLE)
+            self.logger.error("❌ %s service initialization error: %s", label, e)
+        return False
     
     async def generate_response(
         self,
@@ -139,18 +222,21 @@ class AIModelManager:
             Tuple[str, Dict]: (response_text, generation_info)
         """
         # Select optimal model
-        selected_provider = await self._select_model(user, character, user_preferences)
+        selected_provider = self._select_model(user, character, user_preferences)
         
         if not selected_provider:
             return "抱歉，当前所有AI服务都不可用。请稍后再试。", {"model": "fallback", "tokens_used": 0}
         
         try:
             service = self.services[selected_provider]
-            response, token_info = await service.generate_response(
-                character,
-                messages,
-                user_preferences,
-                state,
+            response, token_info = await self._call_with_retry(
+                selected_provider,
+                lambda: service.generate_response(
+                    character,
+                    messages,
+                    user_preferences,
+                    state,
+                ),
             )
             
             # Add model information to response
@@ -160,23 +246,27 @@ class AIModelManager:
                 "service_name": service.service_name
             }
             
-            self.logger.info(f"✅ Response generated using {service.service_name}")
+            if self.logger.isEnabledFor(logging.INFO):
+                self.logger.info("✅ Response generated using %s", service.service_name)
             return response, enhanced_info
             
         except Exception as e:
-            self.logger.error(f"❌ Error with {selected_provider.value}: {e}")
+            self.logger.error("❌ Error with %s: %s", selected_provider.value, e)
             
             # Try fallback if enabled
-            if self.admin_settings["fallback_enabled"]:
-                fallback_provider = await self._get_fallback_model(selected_provider)
+            if self._fallback_enabled:
+                fallback_provider = self._get_fallback_model(selected_provider)
                 if fallback_provider and fallback_provider in self.services:
                     try:
                         fallback_service = self.services[fallback_provider]
-                        response, token_info = await fallback_service.generate_response(
-                            character,
-                            messages,
-                            user_preferences,
-                            state,
+                        response, token_info = await self._call_provider(
+                            fallback_provider,
+                            lambda: fallback_service.generate_response(
+                                character,
+                                messages,
+                                user_preferences,
+                                state,
+                            ),
                         )
                         
                         enhanced_info = {
@@ -186,14 +276,82 @@ class AIModelManager:
                             "fallback_used": True
                         }
                         
-                        self.logger.info(f"✅ Fallback response generated using {fallback_service.service_name}")
+                        self.logger.info("✅ Fallback response generated using %s", fallback_service.service_name)
                         return response, enhanced_info
                     except Exception as fallback_error:
-                        self.logger.error(f"❌ Fallback also failed: {fallback_error}")
+                        self.logger.error("❌ Fallback also failed: %s", fallback_error)
             
             # All services failed
             return "抱歉，AI服务暂时不可用。请稍后再试。", {"model": "error", "tokens_used": 0}
     
+    async def _call_provider(
+        self,
+        provider: ModelProvider,
+        call: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Run an upstream call inside the provider's concurrency limit and, if set, its rate limit
+        
+        Waiting for a concurrency slot and a rate-limit token counts against the
+        same provider timeout as the call itself; asyncio.TimeoutError propagates
+        so callers treat it like any other provider failure. Only the upstream
+        call is folded into the observed latency.
+        """
+        timeout = self._timeouts.get(provider, DEFAULT_RESPONSE_TIMEOUT_SECONDS)
+        semaphore = self._semaphores.get(provider)
+        rate_limiter = self._rate_limiters.get(provider)
+        async with asyncio.timeout(timeout):
+            if semaphore is None:
+                return await call()
+            async with semaphore:
+                if rate_limiter is not None:
+                    await rate_limiter.acquire()
+                started = time.perf_counter()
+                result = await call()
+                self._record_latency(provider, (time.perf_counter() - started) * 1000)
+                return result
+    
+    async def _call_with_retry(
+        self,
+        provider: ModelProvider,
+        call: Callable[[], Awaitable[T]],
+    ) -> T:
+        """
+        Run _call_provider, retrying transient failures with capped, jittered backoff
+        
+        Only timeouts, connection errors, 429s and 5xx are retried; anything
+        else (or the last attempt) is raised so the caller can fall back.
+        """
+        max_attempts = self._retry["max_attempts"]
+        for attempt in range(max_attempts):
+            try:
+                return await self._call_provider(provider, call)
+            except Exception as exc:
+                if attempt >= max_attempts - 1 or not _is_retryable(exc):
+                    raise
+                delay_ms = random.uniform(0, min(self._retry["cap_ms"], self._retry["base_ms"] * 2 ** attempt))
+                self.logger.warning(
+                    "🔁 Retrying %s after transient error (attempt %s/%s, %.0fms): %s",
+                    provider.value, attempt + 1, max_attempts, delay_ms, exc,
+                )
+                await asyncio.sleep(delay_ms / 1000)
+        raise RuntimeError("unreachable")  # pragma: no cover
+    
+    def _make_rate_limiter(self) -> Optional[AsyncTokenBucket]:
+        """Build a provider rate limiter from admin settings, or None when pacing is off"""
+        requests_per_minute = self.admin_settings["requests_per_minute"]
+        if not requests_per_minute:
+            return None
+        return AsyncTokenBucket(rate_per_minute=requests_per_minute)
+    
+    def _record_latency(self, provider: ModelProvider, latency_ms: float) -> None:
+        """Fold a successful call's latency into the provider's moving average"""
+        previous = self._observed_latency_ms.get(provider)
+        if previous is None:
+            self._observed_latency_ms[provider] = latency_ms
+        else:
+            self._observed_latency_ms[provider] = previous + LATENCY_EWMA_ALPHA * (latency_ms - previous)
+    
     async def generate_opening_line(
         self,
         character: Character,
@@ -201,31 +359,37 @@ class AIModelManager:
     ) -> str:
         """Generate opening line using optimal model"""
         
-        selected_provider = await self._select_model(user, character)
+        selected_provider = self._select_model(user, character)
         
         if not selected_provider:
             return f"Hello! I'm {character.name}. Nice to meet you!"
         
         try:
             service = self.services[selected_provider]
-            opening_line = await service.generate_opening_line(character)
-            self.logger.info(f"✅ Opening line generated using {service.service_name}")
+            opening_line = await asyncio.wait_for(
+                service.generate_opening_line(character),
+                timeout=OPENING_LINE_TIMEOUT_SECONDS,
+            )
+            self.logger.info("✅ Opening line generated using %s", service.service_name)
             return opening_line
 
         except Exception as e:
-            self.logger.error(f"❌ Error generating opening line with {selected_provider.value}: {e}")
+            self.logger.error("❌ Error generating opening line with %s: %s", selected_provider.value, e)
 
             # Try fallback
-            if self.admin_settings["fallback_enabled"]:
-                fallback_provider = await self._get_fallback_model(selected_provider)
+            if self._fallback_enabled:
+                fallback_provider = self._get_fallback_model(selected_provider)
                 if fallback_provider and fallback_provider in self.services:
                     try:
                         fallback_service = self.services[fallback_provider]
-                        opening_line = await fallback_service.generate_opening_line(character)
-                        self.logger.info(f"✅ Fallback opening line generated using {fallback_service.service_name}")
+                        opening_line = await asyncio.wait_for(
+                            fallback_service.generate_opening_line(character),
+                            timeout=OPENING_LINE_TIMEOUT_SECONDS,
+                        )
+                        self.logger.info("✅ Fallback opening line generated using %s", fallback_service.service_name)
                         return opening_line
                     except Exception as e:
-                        self.logger.warning(f"Fallback opening line generation failed: {e}")
+                        self.logger.warning("Fallback opening line generation failed: %s", e)
 
             # Final fallback
             return f"Hello! I'm {character.name}. {character.backstory[:100] if character.backstory else 'Nice to meet you!'}..."
@@ -239,7 +403,7 @@ class AIModelManager:
         """Generate per-character default state template."""
 
         safe_mode = (character.nsfw_level or 0) == 0
-        selected_provider = await self._select_model(user, character)
+        selected_provider = self._select_model(user, character)
 
         async def _invoke(provider: ModelProvider) -> Dict[str, str]:
             service = self.services.get(provider)
@@ -264,8 +428,8 @@ class AIModelManager:
         except Exception as exc:
             self.logger.error("❌ Error generating state seed with %s: %s", selected_provider.value, exc)
 
-        if self.admin_settings["fallback_enabled"]:
-            fallback_provider = await self._get_fallback_model(selected_provider)
+        if self._fallback_enabled:
+            fallback_provider = self._get_fallback_model(selected_provider)
             if fallback_provider and fallback_provider in self.services:
                 try:
                     state_seed = await _invoke(fallback_provider)
@@ -280,7 +444,7 @@ class AIModelManager:
 
         return {}
     
-    async def _select_model(
+    def _select_model(
         self,
         user: Optional[User] = None,
         character: Optional[Character] = None,
@@ -292,8 +456,9 @@ class AIModelManager:
         Selection Priority:
         1. User's preferred model (if set and available)
         2. Character-specific model preference (if any)
-        3. Admin default model
-        4. First available model
+        3. Best weighted score when user_preferences sets "optimize_for"
+        4. Admin default model
+        5. First available model
         """
         
         # Get user preferred model
@@ -304,27 +469,96 @@ class AIModelManager:
             except ValueError:
                 pass
         
+        optimize_for = (user_preferences or {}).get("optimize_for")
+        if optimize_for not in PREFERENCE_WEIGHTS:
+            optimize_for = None
+        
+        default_model = self._default_model
+        cache_key = (
+            user_preferred.value if user_preferred else None,
+            default_model,
+            optimize_for,
+            self._enabled_version,
+        )
+        cached = self._select_cache.get(cache_key)
+        if cached is not None:
+            cached_provider, cached_at = cached
+            if (
+                time.monotonic() - cached_at < SELECT_CACHE_TTL_SECONDS
+                and self._is_model_available(cached_provider)
+            ):
+                return cached_provider
+        
+        selected = self._resolve_model(user_preferred, default_model, optimize_for)
+        if selected is not None:
+            self._select_cache[cache_key] = (selected, time.monotonic())
+        return selected
+    
+    def _resolve_model(
+        self,
+        user_preferred: Optional[ModelProvider],
+        default_model: ModelProvider,
+        optimize_for: Optional[str] = None,
+    ) -> Optional[ModelProvider]:
+        """Run the uncached selection priority chain used by _select_model"""
+        
         # Check user preference first
-        if user_preferred and await self._is_model_available(user_preferred):
-            self.logger.info(f"🎯 Using user preferred model: {user_preferred.value}")
+        if user_preferred and self._is_model_available(user_preferred):
+            self.logger.info("🎯 Using user preferred model: %s", user_preferred.value)
             return user_preferred
         
+        # Score available models when the user asked to optimize for a goal
+        if optimize_for:
+            best = self._best_scored_model(PREFERENCE_WEIGHTS[optimize_for])
+            if best:
+                self.logger.info("🎯 Using %s-optimized model: %s", optimize_for, best.value)
+                return best
+        
         # Use admin default if available
-        default_model = self.admin_settings["default_model"]
-        if await self._is_model_available(default_model):
-            self.logger.info(f"🎯 Using default model: {default_model.value}")
+        if self._is_model_available(default_model):
+            self.logger.info("🎯 Using default model: %s", default_model.value)
             return default_model
         
         # Find first available model
-        for provider in self.admin_settings["enabled_models"]:
-            if await self._is_model_available(provider):
-                self.logger.info(f"🎯 Using first available model: {provider.value}")
+        for provider in self._enabled_models:
+            if self._is_model_available(provider):
+                self.logger.info("🎯 Using first available model: %s", provider.value)
                 return provider
         
         self.logger.warning("⚠️ No available AI models found")
         return None
     
-    async def _is_model_available(self, provider: ModelProvider) -> bool:
+    def _best_scored_model(self, weights: Dict[str, float]) -> Optional[ModelProvider]:
+        """
+        Pick the available model with the highest weighted reward
+        
+        Cost and latency are normalized against the worst candidate so each
+        term lands in [0, 1]; latency prefers observed averages over the
+        service's static estimate.
+        """
+        candidates = []
+        for provider in self._enabled_models:
+            if self._is_model_available(provider):
+                service = self.services[provider]
+                latency = self._observed_latency_ms.get(provider, service.p50_latency_ms)
+                candidates.append((provider, service.quality_score, service.cost_per_1k, latency))
+        if not candidates:
+            return None
+        
+        max_cost = max(c[2] for c in candidates) or 1.0
+        max_latency = max(c[3] for c in candidates) or 1.0
+        best_provider, best_score = None, float("-inf")
+        for provider, quality, cost, latency in candidates:
+            score = (
+                weights["quality"] * quality
+                - weights["cost"] * (cost / max_cost)
+                - weights["latency"] * (latency / max_latency)
+            )
+            if score > best_score:
+                best_provider, best_score = provider, score
+        return best_provider
+    
+    def _is_model_available(self, provider: ModelProvider) -> bool:
         """
         Check if a specific model is available
         
@@ -335,7 +569,7 @@ class AIModelManager:
             bool: True if model is available and enabled
         """
         # Check if model is enabled by admin
-        if provider not in self.admin_settings["enabled_models"]:
+        if provider not in self._enabled_set:
             return False
         
         # Check service status
@@ -352,32 +586,49 @@ class AIModelManager:
         
         return False
     
-    async def _get_fallback_model(self, failed_provider: ModelProvider) -> Optional[ModelProvider]:
+    def _get_fallback_model(self, failed_provider: ModelProvider) -> Optional[ModelProvider]:
         """Get fallback model when primary fails"""
-        preferred_fallback = ModelProvider.GROK
-        if failed_provider != preferred_fallback and await self._is_model_available(preferred_fallback):
-            return preferred_fallback
-        for provider in self.admin_settings["enabled_models"]:
-            if provider != failed_provider and await self._is_model_available(provider):
+        for provider in self._fallback_ring.get(failed_provider, ()):
+            if self._is_model_available(provider):
                 return provider
         return None
     
+    def _set_service_status(self, provider: ModelProvider, status: ModelStatus) -> None:
+        """Record a provider status transition and invalidate the status snapshot"""
+        self.service_status[provider] = status
+        self._status_version += 1
+    
     # ADMIN FUNCTIONS
     
     def get_model_status(self) -> Dict[str, Dict[str, Any]]:
-        """Get status of all AI models (for admin dashboard)"""
+        """Get status of all AI models (for admin dashboard)
+        
+        The returned dict is cached until the next status or admin change, or
+        until a service's live is_available flips; callers must treat it as
+        read-only.
+        """
+        availability = tuple(
+            provider in self.services and bool(self.services[provider].is_available)
+            for provider, _ in _PROVIDERS
+        )
+        cache_key = (self._status_version, availability)
+        cached = self._status_cache
+        if cached is not None and cached[0] == cache_key:
+            return cached[1]
+        
         status_info = {}
         
-        for provider in ModelProvider:
+        for (provider, key), is_available in zip(_PROVIDERS, availability):
             service = self.services.get(provider)
-            status_info[provider.value] = {
+            status_info[key] = {
                 "service_name": service.service_name if service else "Not Initialized",
                 "status": self.service_status.get(provider, ModelStatus.UNAVAILABLE).value,
-                "is_available": service.is_available if service else False,
-                "enabled": provider in self.admin_settings["enabled_models"],
-                "is_default": provider == self.admin_settings["default_model"]
+                "is_available": is_available,
+                "enabled": provider in self._enabled_set,
+                "is_default": provider == self._default_model
             }
         
+        self._status_cache = (cache_key, status_info)
         return status_info
     
     def set_model_enabled(self, provider: ModelProvider, enabled: bool) -> bool:
@@ -389,23 +640,67 @@ class AIModelManager:
             else:
                 if provider in self.admin_settings["enabled_models"]:
                     self.admin_settings["enabled_models"].remove(provider)
+            self._rebuild_routing()
             
-            self.logger.info(f"🔧 Model {provider.value} {'enabled' if enabled else 'disabled'} by admin")
+            self.logger.info("🔧 Model %s %s by admin", provider.value, "enabled" if enabled else "disabled")
             return True
         except Exception as e:
-            self.logger.error(f"❌ Failed to {'enable' if enabled else 'disable'} model {provider.value}: {e}")
+            self.logger.error("❌ Failed to %s model %s: %s", "enable" if enabled else "disable", provider.value, e)
             return False
     
     def set_default_model(self, provider: ModelProvider) -> bool:
         """Set default model (admin function)"""
         try:
             self.admin_settings["default_model"] = provider
-            self.logger.info(f"🔧 Default model changed to {provider.value} by admin")
+            self._rebuild_routing()
+            self.logger.info("🔧 Default model changed to %s by admin", provider.value)
+            return True
+        except Exception as e:
+            self.logger.error("❌ Failed to set default model to %s: %s", provider.value, e)
+            return False
+    
+    def set_rate_limit(self, requests_per_minute: Optional[int]) -> bool:
+        """Set the per-provider upstream call budget; None or 0 disables it (admin function)"""
+        try:
+            if requests_per_minute is not None and requests_per_minute < 0:
+                raise ValueError("requests_per_minute must not be negative")
+            self.admin_settings["requests_per_minute"] = requests_per_minute or None
+            # Fresh buckets so the new budget applies to the next call
+            self._rate_limiters = {}
+            for provider in self.services:
+                rate_limiter = self._make_rate_limiter()
+                if rate_limiter is not None:
+                    self._rate_limiters[provider] = rate_limiter
+            self.logger.info("🔧 Provider rate limit set to %s rpm by admin", requests_per_minute or "unlimited")
             return True
         except Exception as e:
-            self.logger.error(f"❌ Failed to set default model to {provider.value}: {e}")
+            self.logger.error("❌ Failed to set provider rate limit to %s: %s", requests_per_minute, e)
             return False
     
+    def _refresh_admin_view(self) -> None:
+        """Mirror admin_settings into attributes read on the request path"""
+        self._enabled_models: Tuple[ModelProvider, ...] = tuple(self.admin_settings["enabled_models"])
+        self._enabled_set = frozenset(self._enabled_models)
+        self._default_model: ModelProvider = self.admin_settings["default_model"]
+        self._fallback_enabled: bool = self.admin_settings["fallback_enabled"]
+    
+    def _rebuild_routing(self) -> None:
+        """Recompute fallback order and drop cached selections after an admin routing change"""
+        self._refresh_admin_view()
+        self._enabled_version += 1
+        self._status_version += 1
+        self._select_cache.clear()
+        
+        # Grok stays the preferred fallback, followed by the remaining enabled models in order
+        enabled = self._enabled_models
+        ordered = ([ModelProvider.GROK] if ModelProvider.GROK in enabled else []) + [
+            provider for provider in enabled if provider != ModelProvider.GROK
+        ]
+        self._fallback_ring = {
+            provider: tuple(candidate for candidate in ordered if candidate != provider)
+            for provider, _ in _PROVIDERS
+        }
+    
     def get_admin_settings(self) -> Dict[str, Any]:
         """Get admin settings"""
         return {
@@ -416,19 +711,31 @@ class AIModelManager:
 
 # Dependency injection compatible instance
 _ai_model_manager_instance: Optional[AIModelManager] = None
+_init_lock = asyncio.Lock()
 
 async def get_ai_model_manager() -> AIModelManager:
     """Get initialized AI model manager instance using dependency injection pattern"""
     global _ai_model_manager_instance
     
-    if _ai_model_manager_instance is None:
-        _ai_model_manager_instance = AIModelManager()
+    manager = _ai_model_manager_instance
+    if manager is not None and manager._initialized:
+        return manager
     
-    if not _ai_model_manager_instance.services:
-        await _ai_model_manager_instance.initialize()
+    # Cold path: only one caller runs initialize(), concurrent callers wait for it
+    async with _init_lock:
+        if _ai_model_manager_instance is None:
+            _ai_model_manager_instance = AIModelManager()
+        
+        if not _ai_model_manager_instance.services:
+            await _ai_model_manager_instance.initialize()
     
     return _ai_model_manager_instance
 
+async def shutdown_ai_model_manager() -> None:
+    """Close the shared manager's network resources (application shutdown hook)"""
+    if _ai_model_manager_instance is not None:
+        await _ai_model_manager_instance.close()
+
 def reset_ai_model_manager():
     """Reset the manager instance - useful for testing"""
     global _ai_model_manager_instance
@@ -19,12 +19,7 @@ import logging
 
 # Import multi-model manager
 from .ai_model_manager import get_ai_model_manager
-from .gemini_service_new import GeminiService  # Simplified service (Issue #129)
-
-
-class AIServiceError(Exception):
-    """AI service specific errors"""
-    pass
+from .ai_service_base import AIServiceError  # Re-exported for backward compatibility
 
 
 class AIService:
@@ -33,7 +28,6 @@ class AIService:
     def __init__(self):
         self.logger = logging.getLogger(__name__)
         self._ai_manager = None
-        self._fallback_service = None  # Fallback to old GeminiService if needed
 
     def log_opening_line_usage(
         self,
@@ -55,15 +49,14 @@ class AIService:
         )
         
     async def _get_ai_manager(self):
-        """Get initialized AI model manager"""
+        """Get initialized AI model manager
+        
+        Initialization errors propagate to the caller; provider-level fallback
+        is handled inside the manager itself.
+        """
         if self._ai_manager is None:
-            try:
-                self._ai_manager = await get_ai_model_manager()
-                self.logger.info("✅ AIService using multi-model manager")
-            except Exception as e:
-                self.logger.warning(f"⚠️ Failed to initialize AI manager, falling back to GeminiService: {e}")
-                if self._fallback_service is None:
-                    self._fallback_service = GeminiService()
+            self._ai_manager = await get_ai_model_manager()
+            self.logger.info("✅ AIService using multi-model manager")
         return self._ai_manager
     
     async def enhance_character_prompts(
@@ -17,12 +17,65 @@ Design Principles:
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import ClassVar, List, Dict, Any, Mapping, Optional, Tuple
 from models import Character, ChatMessage
+from utils.prompt_selector import select_system_prompt
+from .prompt_engine import compile_cached
+import asyncio
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# Strips anything but word characters, whitespace and CJK from character names
+_NAME_SANITIZE_RE = re.compile(r'[^\w\s\u4e00-\u9fff]')
+
+# Fallback replies used when a provider is unavailable
+_UNAVAILABLE_MESSAGE = "抱歉，AI服务暂时不可用。请稍后再试。"
+_UNAVAILABLE_WITH_CHARACTER = "*{} 正在思考中...* " + _UNAVAILABLE_MESSAGE
+
+# Read-only prompt configs shared across turns; keyed by (character id, prompt
+# type, language, persona text) so an edited character never reuses a stale one
+CHARACTER_PROMPT_CACHE_MAXSIZE = 512
+_character_prompt_cache: "OrderedDict[Tuple[Any, ...], Mapping[str, Any]]" = OrderedDict()
+
+_EMPTY_CHARACTER_PROMPT: Mapping[str, Any] = MappingProxyType({
+    "persona_prompt": "",
+    "few_shot_contents": (),
+})
+
+
+def _frozen_character_prompt(
+    character_id: Optional[int],
+    prompt_type: str,
+    chat_language: Optional[str],
+    persona_prompt: str,
+) -> Mapping[str, Any]:
+    key = (character_id, prompt_type, chat_language, persona_prompt)
+    cached = _character_prompt_cache.get(key)
+    if cached is not None:
+        _character_prompt_cache.move_to_end(key)
+        return cached
+    
+    frozen = MappingProxyType({
+        "persona_prompt": persona_prompt,
+        "few_shot_contents": (),
+        # Persona text is a stable per-character prefix; providers with
+        # prompt caching can route on cache_key / tag cache_segments
+        "use_cache": bool(character_id is not None and persona_prompt),
+        "cache_key": f"character-{character_id}-{prompt_type}-{chat_language or 'default'}",
+        "cache_segments": (MappingProxyType({"text": persona_prompt, "cache": "ephemeral", "ttl_s": 300}),),
+        "use_few_shot": False,
+    })
+    if character_id is not None:
+        _character_prompt_cache[key] = frozen
+        if len(_character_prompt_cache) > CHARACTER_PROMPT_CACHE_MAXSIZE:
+            _character_prompt_cache.popitem(last=False)
+    return frozen
+
+
 class AIServiceError(Exception):
     """Base exception for AI service errors"""
     pass
@@ -30,6 +83,24 @@ class AIServiceError(Exception):
 class AIServiceBase(ABC):
     """Abstract base class for all AI services"""
     
+    # True when generate_responses_batch is backed by a native provider batch endpoint
+    supports_batch_api: ClassVar[bool] = False
+    
+    # Leading messages always kept when trimming long conversations (character establishment)
+    _ESTABLISHMENT_COUNT: ClassVar[int] = 3
+    
+    # Routing profile used by AIModelManager preference scoring (rough estimates)
+    cost_per_1k: float = 0.001  # USD per 1k output tokens
+    p50_latency_ms: float = 1500.0
+    quality_score: float = 0.7  # 0-1, relative roleplay quality
+    
+    _class_logger: ClassVar[logging.Logger] = logging.getLogger(f"{__name__}.AIServiceBase")
+    
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Resolve the per-class logger once instead of on every instantiation
+        cls._class_logger = logging.getLogger(f"{__name__}.{cls.__name__}")
+    
     def __init__(self, model_name: str, api_key: Optional[str] = None):
         """
         Initialize AI service
@@ -41,7 +112,7 @@ class AIServiceBase(ABC):
         self.model_name = model_name
         self.api_key = api_key
         self.client = None
-        self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
+        self.logger = self._class_logger
     
     @abstractmethod
     async def initialize(self) -> bool:
@@ -78,6 +149,36 @@ class AIServiceBase(ABC):
         """
         pass
     
+    async def generate_responses_batch(
+        self,
+        requests: List[Tuple[Character, List[ChatMessage], Optional[dict]]],
+        max_concurrency: int = 5,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Generate responses for several independent conversations (bulk jobs, evals)
+        
+        The default runs generate_response concurrently, bounded by a semaphore.
+        Providers with an asynchronous batch API (xAI /v1/batches, Gemini
+        batchGenerateContent) can override this and set supports_batch_api.
+        
+        Args:
+            requests: (character, messages, user_preferences) tuples
+            max_concurrency: Upper bound on in-flight generate_response calls
+            
+        Returns:
+            List of (response_text, token_info) in request order
+            
+        Raises:
+            AIServiceError: If any generation fails
+        """
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+        
+        async def _run(character: Character, messages: List[ChatMessage], prefs: Optional[dict]):
+            async with semaphore:
+                return await self.generate_response(character, messages, prefs)
+        
+        return list(await asyncio.gather(*(_run(c, m, p) for c, m, p in requests)))
+    
     @abstractmethod
     async def generate_opening_line(self, character: Character) -> str:
         """
@@ -120,7 +221,7 @@ class AIServiceBase(ABC):
         self,
         character: Character,
         chat_language: Optional[str] = None,
-    ) -> dict:
+    ) -> Mapping[str, Any]:
         """
         Get character prompt configuration (shared implementation)
         
@@ -131,7 +232,9 @@ class AIServiceBase(ABC):
             character: Character to get prompt for
             
         Returns:
-            dict: Character prompt configuration with persona_prompt and few_shot_contents
+            Mapping: Read-only character prompt configuration with persona_prompt and
+            few_shot_contents, plus cache_key/cache_segments markers for provider
+            prompt caching. Identical configs are shared across calls.
         """
         # Try to load as hardcoded character first
         hardcoded_prompt = self._load_hardcoded_character(character)
@@ -141,21 +244,16 @@ class AIServiceBase(ABC):
         # Use PromptEngine for all characters (post-Issue #129)
         if character:
             try:
-                from utils.prompt_selector import select_system_prompt
-                from .prompt_engine import PromptEngine
                 selected_system_prompt, prompt_type = select_system_prompt(character)
-                engine = PromptEngine(system_prompt=selected_system_prompt)
-
-                user_prefs = {'chat_language': chat_language} if chat_language else None
-                compiled = engine.compile(character, user_prefs=user_prefs)
-                return {
-                    "persona_prompt": compiled.get("system_text", ""),
-                    "few_shot_contents": [],
-                    "use_cache": False,  # No caching in simplified architecture
-                    "use_few_shot": False
-                }
+                compiled = compile_cached(character, selected_system_prompt, chat_language)
+                return _frozen_character_prompt(
+                    character.id,
+                    prompt_type,
+                    chat_language,
+                    compiled.get("system_text", ""),
+                )
             except Exception as e:
-                self.logger.error(f"PromptEngine failed: {e}")
+                self.logger.error("PromptEngine failed: %s", e)
                 # Return basic fallback
                 return {
                     "persona_prompt": f"你是{character.name}。",
@@ -163,10 +261,7 @@ class AIServiceBase(ABC):
                 }
 
         # No character provided
-        return {
-            "persona_prompt": "",
-            "few_shot_contents": []
-        }
+        return _EMPTY_CHARACTER_PROMPT
     
     def _load_hardcoded_character(self, character: Character) -> Optional[dict]:
         """
@@ -222,14 +317,48 @@ class AIServiceBase(ABC):
         if len(messages) <= max_messages:
             return messages
         
-        # Preserve character establishment (first few messages)
-        establishment_messages = messages[:3]
+        # Preserve character establishment (first few messages) plus recent context
+        keep_head = self._ESTABLISHMENT_COUNT
+        managed = [*messages[:keep_head], *messages[-(max_messages - keep_head):]]
+        
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("📏 Conversation length management: %s -> %s messages", len(messages), len(managed))
+        return managed
+    
+    @staticmethod
+    def _dedupe_messages(messages: List[ChatMessage]) -> List[ChatMessage]:
+        """
+        Collapse back-to-back messages with identical role and content
+        
+        These come from client retries and double submits. Only adjacent repeats
+        are dropped; a short reply repeated later in the chat ("好的") is real
+        conversation and is kept. Deterministic, so cached prompt prefixes stay
+        byte-identical across turns.
+        """
+        if len(messages) < 2:
+            return messages
+        
+        deduped = [messages[0]]
+        previous = (messages[0].role, messages[0].content)
+        for message in messages[1:]:
+            current = (message.role, message.content)
+            if current != previous:
+                deduped.append(message)
+                previous = current
         
-        # Keep recent context
-        recent_messages = messages[-(max_messages-3):]
+        return messages if len(deduped) == len(messages) else deduped
+    
+    @staticmethod
+    def _as_soa(messages: List[ChatMessage]) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+        """
+        Read role and content off each message once
         
-        self.logger.info(f"📏 Conversation length management: {len(messages)} -> {len(establishment_messages + recent_messages)} messages")
-        return establishment_messages + recent_messages
+        Provider payload builders zip these instead of going back through the
+        ORM attribute descriptors for every comparison.
+        """
+        roles = tuple(message.role for message in messages)
+        contents = tuple(message.content for message in messages)
+        return roles, contents
     
     def _extract_character_name(self, character: Optional[Character]) -> str:
         """
@@ -243,9 +372,7 @@ class AIServiceBase(ABC):
         """
         if character and character.name:
             # Sanitize character name to prevent prompt injection
-            import re
-            sanitized_name = re.sub(r'[^\w\s\u4e00-\u9fff]', '', character.name)
-            return sanitized_name[:50]  # Limit length
+            return _NAME_SANITIZE_RE.sub('', character.name)[:50]  # Limit length
         
         # Fallback to generic name
         return "AI助手"
@@ -265,15 +392,7 @@ class AIServiceBase(ABC):
         Returns:
             str: Simulated response
         """
-        # Get the last user message
-        last_user_message = ""
-        for msg in reversed(messages):
-            if msg.role == "user":
-                last_user_message = msg.content
-                break
-        
         # Generate fallback response based on character
         if character and character.name:
-            return f"*{character.name} 正在思考中...* 抱歉，AI服务暂时不可用。请稍后再试。"
-        else:
-            return "抱歉，AI服务暂时不可用。请稍后再试。"
+            return _UNAVAILABLE_WITH_CHARACTER.format(character.name)
+        return _UNAVAILABLE_MESSAGE
@@ -3,17 +3,146 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import io
+import json
 import logging
+import os
+import random
 import re
-from datetime import datetime
-from typing import Optional, Tuple
+import tempfile
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, Union
 
 import aiohttp
 from PIL import Image
+from yarl import URL
 
 from .storage_manager import StorageManagerError, get_storage_manager
 
+# Pooled connections to Pollinations and the translate endpoint, reused across requests
+HTTP_CONNECTOR_LIMIT = 64
+# Per-host cap keeps batch jobs from opening a connection storm against Pollinations
+HTTP_CONNECTOR_LIMIT_PER_HOST = 8
+HTTP_KEEPALIVE_SECONDS = 30
+HTTP_DNS_CACHE_SECONDS = 600
+
+# Upstream throttling/outage responses are retried with capped exponential backoff,
+# preferring the server's Retry-After. Callers are interactive, so all attempts and
+# waits share the one request timeout rather than each getting their own
+RETRYABLE_HTTP_STATUSES = frozenset({429, 500, 502, 503, 504})
+HTTP_MAX_ATTEMPTS = 3
+HTTP_BACKOFF_BASE_SECONDS = 1.0
+HTTP_BACKOFF_CAP_SECONDS = 8.0
+
+# Generation parameters sent to Pollinations; part of the avatar cache key
+AVATAR_WIDTH = 512
+AVATAR_HEIGHT = 512
+AVATAR_MODEL = "flux"
+# The prompt is appended as a path segment; yarl encodes it once and aiohttp
+# sends the URL object without reparsing a hand-built string
+POLLINATIONS_URL = URL("https://image.pollinations.ai/prompt")
+POLLINATIONS_QUERY = MappingProxyType({
+    "width": str(AVATAR_WIDTH),
+    "height": str(AVATAR_HEIGHT),
+    "nologo": "true",
+    "model": AVATAR_MODEL,
+    "enhance": "true",
+})
+# Generated images are a few hundred KB; anything far larger is refused while streaming
+MAX_IMAGE_BYTES = 10 * 1024 * 1024
+IMAGE_READ_CHUNK_BYTES = 64 * 1024
+# Avatars are stored as WebP: a fraction of the PNG size at the same perceived
+# quality, and processing already flattens transparency onto white
+AVATAR_WEBP_QUALITY = 85
+AVATAR_WEBP_METHOD = 4
+# Decode/process/encode runs in worker processes so concurrent avatars in a batch
+# are not serialized on the GIL; below two workers a thread is used instead
+AVATAR_CPU_WORKERS = min(4, os.cpu_count() or 1)
+
+# Exact-match cache of finished avatar images, evicted least-recently-used by mtime
+AVATAR_CACHE_DIR = Path(tempfile.gettempdir()) / "intellispark_avatar_cache"
+AVATAR_CACHE_MAX_ENTRIES = 256
+_CACHE_SUFFIX = ".img"
+
+# Recent zh->en prompt translations kept in memory
+TRANSLATION_CACHE_MAXSIZE = 1024
+TRANSLATE_URL = URL("https://translate.googleapis.com/translate_a/single")
+
+
+# Style-specific modifiers with detailed descriptions
+_STYLE_MODIFIERS = MappingProxyType({
+    "fantasy": "fantasy art, magical atmosphere, ethereal lighting, epic, digital painting, artstation quality",
+    "realistic": "photorealistic, professional portrait photography, studio lighting, 8k, dslr, bokeh background",
+    "anime": "anime style, manga illustration, cel shaded, vibrant colors, detailed eyes, studio trigger style",
+    "chinese": "traditional chinese ink painting, elegant watercolor, artistic, cultural attire, ming dynasty style",
+    "scifi": "cyberpunk, futuristic, neon lights, high tech, sci-fi character design, concept art",
+    "medieval": "medieval fantasy, rpg character, detailed armor, castle background, dramatic lighting"
+})
+
+# Gender-specific terms with more detail
+_GENDER_TERMS = MappingProxyType({
+    "female": "beautiful young woman",
+    "male": "handsome young man",
+    "non-binary": "attractive person",
+    "neutral": "person",
+    "other": "person",
+    "not-specified": "person"
+})
+
+# Quality and technical tags for better results
+_QUALITY_TAGS = "highly detailed face, expressive eyes, masterpiece, best quality, 4k, sharp focus"
+
+# Portrait framing
+_FRAMING = "portrait, upper body, centered composition, facing camera"
+
+# Everything after the subject, prebuilt per style
+_PROMPT_SUFFIXES = MappingProxyType({
+    style: f", {modifier}, {_FRAMING}, {_QUALITY_TAGS}"
+    for style, modifier in _STYLE_MODIFIERS.items()
+})
+
+# Prompts without a user description depend only on (gender, style), so they are prebuilt whole
+_GENERIC_PROMPTS = MappingProxyType({
+    (gender, style): f"{term} character portrait{suffix}"
+    for gender, term in _GENDER_TERMS.items()
+    for style, suffix in _PROMPT_SUFFIXES.items()
+})
+
+
+def _image_type(content: bytes) -> Tuple[str, str]:
+    """File extension and mimetype for encoded avatar bytes."""
+    if content[:4] == b"RIFF" and content[8:12] == b"WEBP":
+        return "webp", "image/webp"
+    if content[:3] == b"\xff\xd8\xff":
+        return "jpg", "image/jpeg"
+    return "png", "image/png"
+
+
+def _retry_delay(attempt: int, retry_after: Optional[str]) -> float:
+    """Seconds to wait before the next attempt (attempt is zero-based)."""
+    if retry_after:
+        try:
+            seconds = float(retry_after)
+        except ValueError:
+            try:
+                seconds = (parsedate_to_datetime(retry_after) - datetime.now(timezone.utc)).total_seconds()
+            except (TypeError, ValueError):
+                seconds = None
+        if seconds is not None:
+            return max(0.0, seconds)
+    backoff = min(HTTP_BACKOFF_CAP_SECONDS, HTTP_BACKOFF_BASE_SECONDS * (2 ** attempt))
+    return backoff + random.uniform(0, HTTP_BACKOFF_BASE_SECONDS)
+
+
 class AvatarGenerationError(Exception):
     """Avatar generation specific errors"""
     pass
@@ -22,17 +151,118 @@ class AvatarGenerationError(Exception):
 class AvatarGenerationService:
     """Service for AI-powered avatar generation using Pollinations.AI."""
 
-    def __init__(self) -> None:
+    # Chinese characters in a prompt trigger translation before generation
+    _CJK_RE = re.compile(r'[\u4e00-\u9fff]')
+    # Supabase object keys must be ASCII; anything else in a name becomes "_"
+    _UNSAFE_FILENAME_RE = re.compile(r"[^A-Za-z0-9_-]")
+
+    def __init__(self, cache_dir: Optional[Path] = None) -> None:
         self.logger = logging.getLogger(__name__)
         self.api_url = "https://image.pollinations.ai/prompt/{prompt}"
         self.storage = get_storage_manager()
+        self.cache_dir = cache_dir or AVATAR_CACHE_DIR
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._translate_cache: "OrderedDict[str, str]" = OrderedDict()
+        self._cpu_pool: Optional[ProcessPoolExecutor] = None
+        self._cpu_pool_failed = False
+        # cache key -> running generation, so concurrent identical requests share one upstream call
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # source text -> running translation, shared by a batch's identical prompts
+        self._translate_inflight: Dict[str, asyncio.Future] = {}
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=HTTP_CONNECTOR_LIMIT,
+                limit_per_host=HTTP_CONNECTOR_LIMIT_PER_HOST,
+                ttl_dns_cache=HTTP_DNS_CACHE_SECONDS,
+                keepalive_timeout=HTTP_KEEPALIVE_SECONDS,
+                enable_cleanup_closed=True,
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session and image worker pool (called on application shutdown)."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self._cpu_pool is not None:
+            self._cpu_pool.shutdown(wait=False, cancel_futures=True)
+            self._cpu_pool = None
+
+    def _get_cpu_pool(self) -> Optional[ProcessPoolExecutor]:
+        """Return the image worker pool, creating it on first use (None when unavailable)."""
+        if self._cpu_pool is None and not self._cpu_pool_failed and AVATAR_CPU_WORKERS > 1:
+            try:
+                self._cpu_pool = ProcessPoolExecutor(max_workers=AVATAR_CPU_WORKERS)
+            except (OSError, NotImplementedError) as e:
+                self.logger.warning("Image worker processes unavailable, encoding in threads: %s", e)
+                self._cpu_pool_failed = True
+        return self._cpu_pool
+
+    async def _run_encode(self, image_data: bytes) -> bytes:
+        """Run _encode_avatar off the event loop, in a worker process when possible."""
+        pool = self._get_cpu_pool()
+        if pool is not None:
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, self._encode_avatar, image_data)
+            except BrokenProcessPool:
+                self.logger.warning("Image worker pool died, encoding in a thread")
+                self._cpu_pool = None
+        return await asyncio.to_thread(self._encode_avatar, image_data)
+
+    async def _get_with_retry(
+        self,
+        url: Union[str, URL],
+        timeout_seconds: float,
+        read_body: Callable[[aiohttp.ClientResponse], Awaitable[Any]],
+    ) -> Tuple[int, Any]:
+        """
+        GET url on the shared session, retrying throttled and 5xx responses
+
+        timeout_seconds bounds the whole call, retries and waits included; a
+        retry whose wait would use up the rest of it is not attempted.
+
+        Returns:
+            (status, body): body is read_body(response) on 200, else the error text
+        """
+        session = await self._get_session()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout_seconds
+        attempt = 0
+        while True:
+            remaining = deadline - loop.time()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=remaining)) as response:
+                status = response.status
+                if status == 200:
+                    return status, await read_body(response)
+                attempt += 1
+                delay = None
+                if status in RETRYABLE_HTTP_STATUSES and attempt < HTTP_MAX_ATTEMPTS:
+                    delay = _retry_delay(attempt - 1, response.headers.get("Retry-After"))
+                    if delay >= deadline - loop.time():
+                        delay = None
+                if delay is None:
+                    try:
+                        error_text = await response.text()
+                    except Exception:
+                        error_text = ""
+                    return status, error_text
+            self.logger.warning(
+                "%s returned %s, retrying in %.1fs (attempt %s/%s)",
+                URL(url).host, status, delay, attempt, HTTP_MAX_ATTEMPTS,
+            )
+            await asyncio.sleep(delay)
 
     async def generate_avatar(
         self,
         prompt: str,
         character_name: str,
         gender: str = "female",
-        style: str = "fantasy"
+        style: str = "fantasy",
+        use_cache: bool = True,
     ) -> Tuple[bool, Optional[str], Optional[str]]:
         """
         Generate character avatar using AI
@@ -42,52 +272,45 @@ class AvatarGenerationService:
             character_name: Character name for filename
             gender: Character gender (female/male/neutral)
             style: Art style (fantasy/realistic/anime/chinese)
+            use_cache: Reuse a previous image for identical inputs; pass False
+                to force a fresh variation (the new image replaces the cached one)
 
         Returns:
             (success, avatar_url, error_message)
         """
         try:
-            self.logger.info(f"Generating avatar for {character_name} with style {style}")
-
-            # Translate Chinese to English if needed
-            translated_prompt = await self._translate_if_chinese(prompt)
-
-            # Build optimized prompt
-            full_prompt = self._build_prompt(translated_prompt, gender, style)
-            self.logger.debug(f"Full prompt: {full_prompt}")
-
-            # Generate image using Pollinations.AI
-            image_data = await self._generate_via_pollinations(full_prompt)
-
-            if not image_data:
-                return False, None, "Failed to generate image from AI service"
-
-            # Open image from bytes
-            image = Image.open(io.BytesIO(image_data))
-
-            # Process and optimize image
-            processed_image = self._process_image(image)
-
-            # Serialize to PNG bytes
-            buffer = io.BytesIO()
-            processed_image.save(buffer, format="PNG", optimize=True, quality=85)
-            content = buffer.getvalue()
-
-            # Generate unique filename and store via storage manager
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            # Supabase object keys must be ASCII; strip other characters
-            sanitized = re.sub(r"[^A-Za-z0-9_-]", "_", character_name)
+            self.logger.info("Generating avatar for %s with style %s", character_name, style)
+
+            cache_key = self._cache_key(prompt, gender, style)
+            content = await asyncio.to_thread(self._read_cached, cache_key) if use_cache else None
+
+            if content is not None:
+                self.logger.info("Avatar cache hit for %s", character_name)
+            else:
+                if use_cache:
+                    content = await self._generate_content_once(cache_key, prompt, gender, style)
+                else:
+                    content = await self._generate_content(cache_key, prompt, gender, style)
+
+                if content is None:
+                    return False, None, "Failed to generate image from AI service"
+
+            # Generate unique filename and store via storage manager; the random
+            # suffix keeps same-named avatars created in the same second apart
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            sanitized = self._UNSAFE_FILENAME_RE.sub("_", character_name)
             safe_name = sanitized[:50] or "avatar"
-            filename = f"{safe_name}_{timestamp}_avatar.png"
+            extension, mimetype = _image_type(content)
+            filename = f"{safe_name}_{timestamp}_{uuid.uuid4().hex[:8]}_avatar.{extension}"
             storage_path = f"generated_avatars/{filename}"
 
             stored_file = await self.storage.upload(
                 storage_path,
                 content,
-                mimetype="image/png",
+                mimetype=mimetype,
             )
 
-            self.logger.info(f"Avatar generated successfully: {stored_file.path}")
+            self.logger.info("Avatar generated successfully: %s", stored_file.path)
             return True, stored_file.public_url, None
 
         except StorageManagerError as storage_error:
@@ -99,50 +322,162 @@ class AvatarGenerationService:
             self.logger.error(error_msg, exc_info=True)
             return False, None, error_msg
 
+    async def _generate_content_once(self, cache_key: str, prompt: str, gender: str, style: str) -> Optional[bytes]:
+        """Join an identical generation already in flight, or start one others can join."""
+        task = self._inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate_content(cache_key, prompt, gender, style))
+            self._inflight[cache_key] = task
+            task.add_done_callback(lambda _task: self._inflight.pop(cache_key, None))
+        else:
+            self.logger.info("Joining in-flight avatar generation %s", cache_key[:12])
+        # Shielded so one caller going away does not cancel the others' result
+        return await asyncio.shield(task)
+
+    async def _generate_content(self, cache_key: str, prompt: str, gender: str, style: str) -> Optional[bytes]:
+        """Generate, encode and cache a new avatar image; None if generation failed."""
+        # Translate Chinese to English if needed
+        translated_prompt = await self._translate_if_chinese(prompt)
+
+        # Build optimized prompt
+        full_prompt = self._build_prompt(translated_prompt, gender, style)
+        self.logger.debug("Full prompt: %s", full_prompt)
+
+        # Generate image using Pollinations.AI
+        image_data = await self._generate_via_pollinations(full_prompt)
+
+        if not image_data:
+            return None
+
+        # Decode, process and re-encode off the event loop (CPU-bound)
+        content = await self._run_encode(image_data)
+
+        await asyncio.to_thread(self._write_cached, cache_key, content)
+        return content
+
+    @staticmethod
+    def _cache_key(prompt: str, gender: str, style: str) -> str:
+        """Content address for an avatar request (inputs plus generation parameters)."""
+        parts = (
+            (prompt or "").strip(),
+            (gender or "").lower(),
+            (style or "").lower(),
+            str(AVATAR_WIDTH),
+            str(AVATAR_HEIGHT),
+            AVATAR_MODEL,
+        )
+        return hashlib.blake2b("\x1f".join(parts).encode("utf-8"), digest_size=16).hexdigest()
+
+    def _read_cached(self, cache_key: str) -> Optional[bytes]:
+        path = self.cache_dir / f"{cache_key}{_CACHE_SUFFIX}"
+        try:
+            content = path.read_bytes()
+            os.utime(path)  # mark as recently used
+            return content
+        except OSError:
+            return None
+
+    def _write_cached(self, cache_key: str, content: bytes) -> None:
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self.cache_dir / f"{cache_key}{_CACHE_SUFFIX}"
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(content)
+            os.replace(tmp_path, path)
+            self._prune_cache()
+        except OSError as e:
+            # Caching is best-effort; a full or read-only disk must not fail generation
+            self.logger.warning("Could not write avatar cache entry: %s", e)
+
+    def _prune_cache(self) -> None:
+        entries = list(self.cache_dir.glob(f"*{_CACHE_SUFFIX}"))
+        excess = len(entries) - AVATAR_CACHE_MAX_ENTRIES
+        if excess <= 0:
+            return
+        entries.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:excess]:
+            entry.unlink(missing_ok=True)
+
     async def _translate_if_chinese(self, text: str) -> str:
         """
         Detect and translate Chinese text to English for better AI image generation
 
         Uses a simple translation approach via Google Translate (free, no API key)
         """
-        if not text or not text.strip():
+        if not text or text.isspace():
             return text
 
-        # Check if text contains Chinese characters
-        chinese_char_pattern = re.compile(r'[\u4e00-\u9fff]+')
-        if not chinese_char_pattern.search(text):
+        # Check if text contains Chinese characters; ASCII-only prompts (the
+        # common English case) are ruled out without running the regex
+        if text.isascii() or not self._CJK_RE.search(text):
             # No Chinese characters, return as-is
             self.logger.debug("No Chinese characters detected, using original prompt")
             return text
 
+        cache_key = text.strip()
+        cached = self._translate_cache.get(cache_key)
+        if cached is not None:
+            self._translate_cache.move_to_end(cache_key)
+            return cached
+
+        task = self._translate_inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch_translation(text, cache_key))
+            self._translate_inflight[cache_key] = task
+            task.add_done_callback(lambda _task: self._translate_inflight.pop(cache_key, None))
+        return await asyncio.shield(task)
+
+    async def _fetch_translation(self, text: str, cache_key: str) -> str:
+        """Translate text via Google Translate; the original text is returned on any failure."""
         try:
-            self.logger.info(f"Translating Chinese prompt to English: {text[:50]}...")
-
-            # Use Google Translate via requests (free, no API key needed)
-            import urllib.parse
-            encoded_text = urllib.parse.quote(text)
-            translate_url = f"https://translate.googleapis.com/translate_a/single?client=gtx&sl=zh-CN&tl=en&dt=t&q={encoded_text}"
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(translate_url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    if response.status == 200:
-                        result = await response.json()
-                        # Parse the response format: [[[translated_text, original_text, null, null, ...], ...], ...]
-                        if result and len(result) > 0 and len(result[0]) > 0:
-                            translated = result[0][0][0]
-                            self.logger.info(f"Translated to: {translated}")
-                            return translated
-                        else:
-                            self.logger.warning("Translation response format unexpected, using original")
-                            return text
-                    else:
-                        self.logger.warning(f"Translation failed with status {response.status}, using original")
-                        return text
+            self.logger.info("Translating Chinese prompt to English: %.50s...", text)
+
+            # Use Google Translate (free, no API key needed)
+            translate_url = TRANSLATE_URL.with_query(client="gtx", sl="zh-CN", tl="en", dt="t", q=text)
+
+            status, result = await self._get_with_retry(translate_url, 10, lambda response: response.read())
+            if status == 200:
+                translated = self._parse_translation(result)
+                if translated:
+                    self.logger.info("Translated to: %s", translated)
+                    self._remember_translation(cache_key, translated)
+                    return translated
+                else:
+                    self.logger.warning("Translation response format unexpected, using original")
+                    return text
+            else:
+                self.logger.warning("Translation failed with status %s, using original", status)
+                return text
 
         except Exception as e:
-            self.logger.warning(f"Translation error: {str(e)}, using original prompt")
+            self.logger.warning("Translation error: %s, using original prompt", e)
             return text
 
+    @staticmethod
+    def _parse_translation(payload: bytes) -> Optional[str]:
+        """
+        Extract the translation from a translate_a/single response
+
+        Format: [[[translated_text, original_text, null, null, ...], ...], ...] with
+        one inner entry per sentence. Decoded straight from bytes, since the
+        endpoint does not always label its body as application/json.
+        """
+        try:
+            result = json.loads(payload)
+            segments = result[0]
+            translated = "".join(segment[0] for segment in segments if segment and isinstance(segment[0], str))
+        except (ValueError, TypeError, IndexError):
+            return None
+        return translated.strip() or None
+
+    def _remember_translation(self, source: str, translated: str) -> None:
+        # Only successful translations are cached; failures fall back to the
+        # original text and are retried on the next request
+        self._translate_cache[source] = translated
+        self._translate_cache.move_to_end(source)
+        if len(self._translate_cache) > TRANSLATION_CACHE_MAXSIZE:
+            self._translate_cache.popitem(last=False)
+
     async def _generate_via_pollinations(self, prompt: str) -> Optional[bytes]:
         """
         Generate image using Pollinations.AI API
@@ -153,92 +488,99 @@ class AvatarGenerationService:
         Uses Flux model for better quality and prompt adherence.
         """
         try:
-            # URL encode the prompt
-            import urllib.parse
-            encoded_prompt = urllib.parse.quote(prompt)
-
             # Use Flux model with specific parameters for better quality
             # model: flux for best quality and prompt following
             # width/height: 512x512 for avatar size
             # nologo: remove watermark
-            # seed: random for variety
-            url = f"https://image.pollinations.ai/prompt/{encoded_prompt}?width=512&height=512&nologo=true&model=flux&enhance=true"
-
-            self.logger.info(f"Requesting image from Pollinations.AI with Flux model...")
-            self.logger.debug(f"URL: {url[:200]}...")  # Log first 200 chars of URL
-
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=90)) as response:
-                    if response.status == 200:
-                        image_data = await response.read()
-                        self.logger.info(f"Image generated successfully, size: {len(image_data)} bytes")
-                        return image_data
-                    else:
-                        self.logger.error(f"Pollinations.AI returned status {response.status}")
-                        # Try to get error message
-                        try:
-                            error_text = await response.text()
-                            self.logger.error(f"Error response: {error_text[:200]}")
-                        except:
-                            pass
-                        return None
+            url = (POLLINATIONS_URL / prompt).with_query(POLLINATIONS_QUERY)
+
+            self.logger.info("Requesting image from Pollinations.AI with Flux model...")
+            if self.logger.isEnabledFor(logging.DEBUG):
+                self.logger.debug("URL: %s...", str(url)[:200])  # Log first 200 chars of URL
+
+            status, body = await self._get_with_retry(url, 90, self._read_image_body)
+            if status == 200:
+                self.logger.info("Image generated successfully, size: %s bytes", len(body))
+                return body
+            else:
+                self.logger.error("Pollinations.AI returned status %s", status)
+                if body:
+                    self.logger.error("Error response: %.200s", body)
+                return None
         except asyncio.TimeoutError:
             self.logger.error("Timeout while generating image (90s limit exceeded)")
             return None
         except Exception as e:
-            self.logger.error(f"Error generating image via Pollinations.AI: {str(e)}", exc_info=True)
+            self.logger.error("Error generating image via Pollinations.AI: %s", e, exc_info=True)
             return None
 
+    @staticmethod
+    async def _read_image_body(response: aiohttp.ClientResponse) -> bytearray:
+        """
+        Stream the image into one buffer, presized from Content-Length when known
+
+        Avoids joining a list of chunks into a second copy, and stops reading
+        once the body exceeds MAX_IMAGE_BYTES.
+        """
+        declared = response.content_length
+        if declared is not None and declared > MAX_IMAGE_BYTES:
+            raise AvatarGenerationError(f"Image response too large ({declared} bytes)")
+
+        # Content-Length counts encoded bytes and aiohttp transparently
+        # decompresses gzip/deflate bodies, so the length is only a capacity
+        # hint, and only for unencoded responses; the buffer grows past it
+        encoded = response.headers.get("Content-Encoding", "identity").lower() != "identity"
+        buffer = bytearray(declared if declared and not encoded else 0)
+        offset = 0
+        async for chunk in response.content.iter_chunked(IMAGE_READ_CHUNK_BYTES):
+            end = offset + len(chunk)
+            if end > MAX_IMAGE_BYTES:
+                raise AvatarGenerationError("Image response too large")
+            # Overwrites presized space in place and extends the buffer beyond it
+            buffer[offset:end] = chunk
+            offset = end
+        del buffer[offset:]
+        return buffer
+
     def _build_prompt(self, base_prompt: str, gender: str, style: str) -> str:
         """
         Build optimized prompt for avatar generation
 
         Combines user input with style-specific modifiers and quality tags
         """
-        # Style-specific modifiers with detailed descriptions
-        style_modifiers = {
-            "fantasy": "fantasy art, magical atmosphere, ethereal lighting, epic, digital painting, artstation quality",
-            "realistic": "photorealistic, professional portrait photography, studio lighting, 8k, dslr, bokeh background",
-            "anime": "anime style, manga illustration, cel shaded, vibrant colors, detailed eyes, studio trigger style",
-            "chinese": "traditional chinese ink painting, elegant watercolor, artistic, cultural attire, ming dynasty style",
-            "scifi": "cyberpunk, futuristic, neon lights, high tech, sci-fi character design, concept art",
-            "medieval": "medieval fantasy, rpg character, detailed armor, castle background, dramatic lighting"
-        }
-
-        # Gender-specific terms with more detail
-        gender_terms = {
-            "female": "beautiful young woman",
-            "male": "handsome young man",
-            "non-binary": "attractive person",
-            "neutral": "person",
-            "other": "person",
-            "not-specified": "person"
-        }
-
-        # Get modifiers
-        style_mod = style_modifiers.get(style.lower(), style_modifiers["fantasy"])
-        gender_term = gender_terms.get(gender.lower(), gender_terms["neutral"])
-
-        # Quality and technical tags for better results
-        quality_tags = "highly detailed face, expressive eyes, masterpiece, best quality, 4k, sharp focus"
-
-        # Portrait framing
-        framing = "portrait, upper body, centered composition, facing camera"
-
-        # Construct final prompt with proper structure
-        if base_prompt and base_prompt.strip():
-            # User provided custom prompt - give it priority
-            full_prompt = f"{gender_term} {base_prompt}, {style_mod}, {framing}, {quality_tags}"
-        else:
-            # Generate generic prompt based on style and gender
-            full_prompt = f"{gender_term} character portrait, {style_mod}, {framing}, {quality_tags}"
-
-        # Log the prompt for debugging
-        self.logger.info(f"Generated prompt: {full_prompt}")
-
-        return full_prompt
-
-    def _process_image(self, image: Image.Image) -> Image.Image:
+        # Unknown styles and genders fall back to fantasy / neutral
+        style_key = style.lower()
+        if style_key not in _PROMPT_SUFFIXES:
+            style_key = "fantasy"
+        gender_key = gender.lower()
+        if gender_key not in _GENDER_TERMS:
+            gender_key = "neutral"
+
+        if not base_prompt or base_prompt.isspace():
+            # Generic prompt based on style and gender
+            return _GENERIC_PROMPTS[gender_key, style_key]
+
+        # User provided custom prompt - give it priority
+        return f"{_GENDER_TERMS[gender_key]} {base_prompt}{_PROMPT_SUFFIXES[style_key]}"
+
+    @staticmethod
+    def _encode_avatar(image_data: bytes) -> bytes:
+        """Decode the generated image, normalize it and serialize to WebP bytes.
+
+        Static (and so picklable) because it runs in the image worker processes.
+        """
+        # Open image from bytes (lazy: only the header is parsed here)
+        with io.BytesIO(image_data) as source, Image.open(source) as image:
+            # Process and optimize image; the decoded source is released on leaving the block
+            processed_image = AvatarGenerationService._process_image(image)
+
+        # Serialize to WebP bytes
+        with io.BytesIO() as buffer:
+            processed_image.save(buffer, format="WEBP", quality=AVATAR_WEBP_QUALITY, method=AVATAR_WEBP_METHOD)
+            return buffer.getvalue()
+
+    @staticmethod
+    def _process_image(image: Image.Image) -> Image.Image:
         """
         Process and optimize generated image
 
@@ -248,32 +590,37 @@ class AvatarGenerationService:
         """
         # Convert RGBA to RGB if needed
         if image.mode == 'RGBA':
-            # Create white background
-            background = Image.new('RGB', image.size, (255, 255, 255))
-            background.paste(image, mask=image.split()[3])  # Use alpha channel as mask
-            image = background
+            alpha = image.getchannel('A')
+            if alpha.getextrema() == (255, 255):
+                # Fully opaque: just drop the alpha band, no composite needed
+                image = image.convert('RGB')
+            else:
+                # Create white background
+                background = Image.new('RGB', image.size, (255, 255, 255))
+                background.paste(image, mask=alpha)  # Use alpha channel as mask
+                image = background
         elif image.mode != 'RGB':
             image = image.convert('RGB')
 
         # Resize to standard avatar size (512x512)
         target_size = (512, 512)
 
-        # Calculate aspect ratio
-        aspect_ratio = image.width / image.height
-
-        if aspect_ratio > 1:
+        # Centered square crop box; resize() samples from it directly instead of
+        # materializing a cropped copy first
+        if image.width > image.height:
             # Width > Height, crop width
-            new_width = int(image.height * 1.0)
-            left = (image.width - new_width) // 2
-            image = image.crop((left, 0, left + new_width, image.height))
-        elif aspect_ratio < 1:
+            left = (image.width - image.height) // 2
+            crop_box = (left, 0, left + image.height, image.height)
+        elif image.width < image.height:
             # Height > Width, crop height
-            new_height = int(image.width * 1.0)
-            top = (image.height - new_height) // 2
-            image = image.crop((0, top, image.width, top + new_height))
+            top = (image.height - image.width) // 2
+            crop_box = (0, top, image.width, top + image.width)
+        else:
+            crop_box = None
 
-        # Resize to target size with high-quality resampling
-        image = image.resize(target_size, Image.Resampling.LANCZOS)
+        # Resize to target size with high-quality resampling; reducing_gap lets
+        # large sources take a cheap integer reduce before the LANCZOS pass
+        image = image.resize(target_size, Image.Resampling.LANCZOS, box=crop_box, reducing_gap=3.0)
 
         return image
 
@@ -292,24 +639,64 @@ class AvatarGenerationService:
         Returns:
             List of results with success/url/error for each
         """
-        semaphore = asyncio.Semaphore(max_concurrent)
-
-        async def generate_with_semaphore(prompt_data):
-            async with semaphore:
-                success, url, error = await self.generate_avatar(
-                    prompt=prompt_data.get('prompt', ''),
-                    character_name=prompt_data.get('character_name', 'avatar'),
-                    gender=prompt_data.get('gender', 'female'),
-                    style=prompt_data.get('style', 'fantasy')
-                )
-                return {
-                    'character_name': prompt_data.get('character_name'),
-                    'success': success,
-                    'url': url,
-                    'error': error
-                }
-
-        tasks = [generate_with_semaphore(p) for p in prompts]
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        results: list = [None] * len(prompts)
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in enumerate(prompts):
+            queue.put_nowait(item)
+
+        async def worker() -> None:
+            # A fixed pool drains the queue, so only max_concurrent coroutines
+            # exist however many prompts are submitted
+            while True:
+                try:
+                    index, prompt_data = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    return
+                try:
+                    success, url, error = await self.generate_avatar(
+                        prompt=prompt_data.get('prompt', ''),
+                        character_name=prompt_data.get('character_name', 'avatar'),
+                        gender=prompt_data.get('gender', 'female'),
+                        style=prompt_data.get('style', 'fantasy')
+                    )
+                    results[index] = {
+                        'character_name': prompt_data.get('character_name'),
+                        'success': success,
+                        'url': url,
+                        'error': error
+                    }
+                except Exception as e:
+                    # Keep the result shape uniform so callers can always read 'success'
+                    self.logger.error("Batch avatar generation failed for %s: %s", prompt_data.get('character_name'), e)
+                    results[index] = {
+                        'character_name': prompt_data.get('character_name'),
+                        'success': False,
+                        'url': None,
+                        'error': str(e)
+                    }
+
+        workers = min(max(1, max_concurrent), len(prompts))
+        # Workers record failures themselves; the group only has to cancel the
+        # rest if the batch itself is cancelled
+        async with asyncio.TaskGroup() as group:
+            for _ in range(workers):
+                group.create_task(worker())
 
         return results
+
+
+_avatar_generation_service: Optional[AvatarGenerationService] = None
+
+
+def get_avatar_generation_service() -> AvatarGenerationService:
+    global _avatar_generation_service
+    if _avatar_generation_service is None:
+        _avatar_generation_service = AvatarGenerationService()
+    return _avatar_generation_service
+
+
+async def shutdown_avatar_generation_service() -> None:
+    global _avatar_generation_service
+    if _avatar_generation_service is not None:
+        await _avatar_generation_service.close()
+        _avatar_generation_service = None
@@ -17,12 +17,15 @@ Features:
 """
 
 from typing import List, Dict, Any, Optional, Tuple
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, desc, asc
+from sqlalchemy import and_, or_, desc, asc, case, exists, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from pathlib import Path
 import logging
 import os
 import asyncio
+import copy
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 from models import Character, CharacterGalleryImage, User
@@ -32,6 +35,31 @@ from utils.character_utils import resolve_asset_url
 from utils.datetime_utils import format_datetime
 
 
+# Formatted gallery responses, shared by the per-request service instances. Keys
+# include the character's gallery_updated_at, which every gallery write bumps, so
+# entries go stale by key rather than by explicit invalidation; the TTL bounds
+# how long writes from outside this service can go unseen.
+GALLERY_CACHE_MAXSIZE = 1024
+GALLERY_CACHE_TTL_SECONDS = 300.0
+_gallery_cache: "OrderedDict[tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+# Columns read by _format_gallery_image; selecting them directly yields plain
+# rows with the same attribute names and skips ORM identity-map hydration
+_GALLERY_IMAGE_COLUMNS = (
+    CharacterGalleryImage.id,
+    CharacterGalleryImage.image_url,
+    CharacterGalleryImage.thumbnail_url,
+    CharacterGalleryImage.alt_text,
+    CharacterGalleryImage.category,
+    CharacterGalleryImage.display_order,
+    CharacterGalleryImage.is_primary,
+    CharacterGalleryImage.file_size,
+    CharacterGalleryImage.dimensions,
+    CharacterGalleryImage.file_format,
+    CharacterGalleryImage.created_at,
+)
+
+
 class CharacterGalleryServiceError(Exception):
     """Character gallery service specific errors"""
     pass
@@ -40,7 +68,7 @@ class CharacterGalleryServiceError(Exception):
 class CharacterGalleryService:
     """Service for handling character gallery operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.logger = logging.getLogger(__name__)
         self.upload_service = UploadService()
@@ -80,27 +108,52 @@ class CharacterGalleryService:
         """
         try:
             # Get character with gallery data
-            character = self.db.query(Character).filter(Character.id == character_id).first()
+            character = (
+                await self.db.execute(select(Character).where(Character.id == character_id))
+            ).scalars().first()
             if not character:
                 raise CharacterGalleryServiceError(f"Character with ID {character_id} not found")
             
-            # Get all active gallery images ordered by display_order
-            gallery_images = self.db.query(CharacterGalleryImage).filter(
-                and_(
-                    CharacterGalleryImage.character_id == character_id,
-                    CharacterGalleryImage.is_active == True
+            # Every character field the response embeds is part of the key
+            cache_key = (
+                character_id,
+                include_avatar_in_images,
+                character.gallery_updated_at,
+                character.gallery_enabled,
+                character.name,
+                character.avatar_url,
+            )
+            cached = _gallery_cache.get(cache_key)
+            if cached is not None and time.monotonic() - cached[0] < GALLERY_CACHE_TTL_SECONDS:
+                _gallery_cache.move_to_end(cache_key)
+                # Callers get their own copy so edits never reach the cache
+                return copy.deepcopy(cached[1])
+            
+            # Get all active gallery images ordered by display_order; only the
+            # columns the response needs are loaded, as plain rows
+            gallery_images = (await self.db.execute(
+                select(*_GALLERY_IMAGE_COLUMNS).where(
+                    and_(
+                        CharacterGalleryImage.character_id == character_id,
+                        CharacterGalleryImage.is_active == True
+                    )
+                ).order_by(
+                    desc(CharacterGalleryImage.is_primary),  # Primary images first
+                    asc(CharacterGalleryImage.display_order),
+                    asc(CharacterGalleryImage.created_at)
                 )
-            ).order_by(
-                desc(CharacterGalleryImage.is_primary),  # Primary images first
-                asc(CharacterGalleryImage.display_order),
-                asc(CharacterGalleryImage.created_at)
-            ).all()
+            )).all()
             
             # Determine primary/profile image
-            primary = await self._get_primary_image(gallery_images, character)
+            primary = self._get_primary_image(gallery_images, character)
 
-            # Format images
-            formatted_images = [await self._format_gallery_image(img) for img in gallery_images]
+            # Format images, collecting categories in the same pass
+            formatted_images = []
+            categories = set()
+            for img in gallery_images:
+                formatted_images.append(self._format_gallery_image(img))
+                if img.category:
+                    categories.add(img.category)
 
             # Optionally ensure avatar/primary is first (for user gallery display),
             # but do not inject into admin lists to avoid non-DB items
@@ -122,17 +175,11 @@ class CharacterGalleryService:
                         "is_gallery_image": False
                     }
 
-                # Ensure avatar/primary is first in images for user-facing gallery
-                
-                if primary.get("id") is not None:
-                    # Primary is a real gallery image — move it to front
-                    try:
-                        idx = next(i for i, img in enumerate(formatted_images) if img.get("id") == primary.get("id"))
-                        if idx != 0:
-                            formatted_images.insert(0, formatted_images.pop(idx))
-                    except StopIteration:
-                        pass
-                else:
+                # Ensure avatar/primary is first in images for user-facing gallery.
+                # A primary that is a real gallery image is already first: the
+                # query orders is_primary DESC and _get_primary_image falls back
+                # to the first row.
+                if primary.get("id") is None:
                     # Primary is avatar fallback; inject as first if not duplicate by URL
                     if not any(img.get("url") == primary.get("url") for img in formatted_images):
                         formatted_images.insert(0, primary)
@@ -145,13 +192,18 @@ class CharacterGalleryService:
                 "gallery_enabled": character.gallery_enabled or len(gallery_images) > 1,
                 "primary_image": primary,
                 "images": formatted_images,
-                "categories": await self._get_image_categories(gallery_images),
+                "categories": sorted(categories) or ["general"],
                 "last_updated": format_datetime(character.gallery_updated_at),
                 "fallback_avatar": resolve_asset_url(character.avatar_url) if character.avatar_url else None
             }
             
+            _gallery_cache[cache_key] = (time.monotonic(), gallery_data)
+            _gallery_cache.move_to_end(cache_key)
+            if len(_gallery_cache) > GALLERY_CACHE_MAXSIZE:
+                _gallery_cache.popitem(last=False)
+            
             self.logger.info(f"Retrieved gallery for character '{character.name}': {len(gallery_images)} images")
-            return gallery_data
+            return copy.deepcopy(gallery_data)
             
         except CharacterGalleryServiceError:
             raise
@@ -179,24 +231,35 @@ class CharacterGalleryService:
             (success, image_data, error_message)
         """
         try:
-            # Verify character exists
-            character = self.db.query(Character).filter(Character.id == character_id).first()
-            if not character:
+            # Verify character exists; only the name is needed
+            character_name = (
+                await self.db.execute(select(Character.name).where(Character.id == character_id))
+            ).scalars().first()
+            if character_name is None:
                 return False, {}, f"Character with ID {character_id} not found"
             
+            now = datetime.utcnow()
+            
             # If caller requested primary, unset others
             if is_primary:
-                await self._unset_primary_images(character_id)
+                await self._unset_primary_images(character_id, now)
             
-            # Determine display order
-            display_order = await self._get_next_display_order(character_id)
+            # Next display order is computed inside the INSERT itself
+            display_order = select(
+                func.coalesce(func.max(CharacterGalleryImage.display_order), -1) + 1
+            ).where(
+                and_(
+                    CharacterGalleryImage.character_id == character_id,
+                    CharacterGalleryImage.is_active == True
+                )
+            ).scalar_subquery()
             
             # Create gallery image record
             gallery_image = CharacterGalleryImage(
                 character_id=character_id,
                 image_url=image_data.get('image_url'),
                 thumbnail_url=image_data.get('thumbnail_url'),
-                alt_text=image_data.get('alt_text') or f"{character.name} gallery image",
+                alt_text=image_data.get('alt_text') or f"{character_name} gallery image",
                 category=image_data.get('category', 'general'),
                 display_order=display_order,
                 is_primary=is_primary,
@@ -207,20 +270,21 @@ class CharacterGalleryService:
             )
             
             self.db.add(gallery_image)
-            self.db.commit()
-            self.db.refresh(gallery_image)
             
-            # Update character gallery statistics
-            await self._update_character_gallery_stats(character_id)
+            # Update character gallery statistics in the same transaction
+            await self._update_character_gallery_stats(character_id, now)
+            
+            await self.db.commit()
+            await self.db.refresh(gallery_image)
             
             # Format response
-            response_data = await self._format_gallery_image(gallery_image)
+            response_data = self._format_gallery_image(gallery_image)
             
-            self.logger.info(f"Added gallery image for character '{character.name}': {gallery_image.id}")
+            self.logger.info(f"Added gallery image for character '{character_name}': {gallery_image.id}")
             return True, response_data, None
             
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             self.logger.error(f"Error adding gallery image: {e}")
             return False, {}, f"Failed to add gallery image: {e}"
     
@@ -237,34 +301,51 @@ class CharacterGalleryService:
         """
         try:
             # Verify image exists and belongs to character
-            gallery_image = self.db.query(CharacterGalleryImage).filter(
-                and_(
-                    CharacterGalleryImage.id == image_id,
-                    CharacterGalleryImage.character_id == character_id,
-                    CharacterGalleryImage.is_active == True
+            gallery_image = (await self.db.execute(
+                select(CharacterGalleryImage).where(
+                    and_(
+                        CharacterGalleryImage.id == image_id,
+                        CharacterGalleryImage.character_id == character_id,
+                        CharacterGalleryImage.is_active == True
+                    )
                 )
-            ).first()
+            )).scalars().first()
             
             if not gallery_image:
                 return False, f"Gallery image with ID {image_id} not found for character {character_id}"
             
-            # Unset other primary images
-            await self._unset_primary_images(character_id)
+            # Nothing to write when it is already the primary image
+            if gallery_image.is_primary:
+                return True, None
             
-            # Set this image as primary
-            gallery_image.is_primary = True
-            gallery_image.updated_at = datetime.utcnow()
+            now = datetime.utcnow()
             
-            self.db.commit()
+            # Unset other primary images and set this one in a single UPDATE
+            await self.db.execute(
+                update(CharacterGalleryImage).where(
+                    and_(
+                        CharacterGalleryImage.character_id == character_id,
+                        or_(
+                            CharacterGalleryImage.is_primary == True,
+                            CharacterGalleryImage.id == image_id
+                        )
+                    )
+                ).values(
+                    is_primary=case((CharacterGalleryImage.id == image_id, True), else_=False),
+                    updated_at=now
+                )
+            )
             
             # Update character gallery stats
-            await self._update_character_gallery_stats(character_id)
+            await self._update_character_gallery_stats(character_id, now)
+            
+            await self.db.commit()
             
             self.logger.info(f"Set image {image_id} as primary for character {character_id}")
             return True, None
             
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             self.logger.error(f"Error updating primary image: {e}")
             return False, f"Failed to update primary image: {e}"
     
@@ -281,31 +362,35 @@ class CharacterGalleryService:
         """
         try:
             # Find and verify image
-            gallery_image = self.db.query(CharacterGalleryImage).filter(
-                and_(
-                    CharacterGalleryImage.id == image_id,
-                    CharacterGalleryImage.character_id == character_id,
-                    CharacterGalleryImage.is_active == True
+            gallery_image = (await self.db.execute(
+                select(CharacterGalleryImage).where(
+                    and_(
+                        CharacterGalleryImage.id == image_id,
+                        CharacterGalleryImage.character_id == character_id,
+                        CharacterGalleryImage.is_active == True
+                    )
                 )
-            ).first()
+            )).scalars().first()
             
             if not gallery_image:
                 return False, f"Gallery image with ID {image_id} not found"
             
+            now = datetime.utcnow()
+            
             # Soft delete
             gallery_image.is_active = False
-            gallery_image.updated_at = datetime.utcnow()
-            
-            self.db.commit()
+            gallery_image.updated_at = now
             
             # Update character gallery stats
-            await self._update_character_gallery_stats(character_id)
+            await self._update_character_gallery_stats(character_id, now)
+            
+            await self.db.commit()
             
             self.logger.info(f"Soft deleted gallery image {image_id} for character {character_id}")
             return True, None
             
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             self.logger.error(f"Error deleting gallery image: {e}")
             return False, f"Failed to delete gallery image: {e}"
     
@@ -325,46 +410,56 @@ class CharacterGalleryService:
             (success, error_message)
         """
         try:
-            # Update display orders
-            for order_item in image_order:
-                image_id = order_item.get('image_id')
-                display_order = order_item.get('display_order')
-                
-                gallery_image = self.db.query(CharacterGalleryImage).filter(
-                    and_(
-                        CharacterGalleryImage.id == image_id,
-                        CharacterGalleryImage.character_id == character_id,
-                        CharacterGalleryImage.is_active == True
+            # Update display orders in one statement; ids that are unknown, inactive
+            # or belong to another character are skipped as before
+            new_orders = {
+                order_item.get('image_id'): order_item.get('display_order')
+                for order_item in image_order
+                if order_item.get('image_id') is not None
+            }
+            
+            if new_orders:
+                now = datetime.utcnow()
+                await self.db.execute(
+                    update(CharacterGalleryImage)
+                    .where(
+                        and_(
+                            CharacterGalleryImage.id.in_(list(new_orders)),
+                            CharacterGalleryImage.character_id == character_id,
+                            CharacterGalleryImage.is_active == True
+                        )
                     )
-                ).first()
-                
-                if gallery_image:
-                    gallery_image.display_order = display_order
-                    gallery_image.updated_at = datetime.utcnow()
+                    .values(
+                        display_order=case(new_orders, value=CharacterGalleryImage.id),
+                        updated_at=now
+                    )
+                )
+                # Bumps gallery_updated_at so cached gallery responses are replaced
+                await self._update_character_gallery_stats(character_id, now)
             
-            self.db.commit()
+            await self.db.commit()
             
             self.logger.info(f"Reordered {len(image_order)} gallery images for character {character_id}")
             return True, None
             
         except Exception as e:
-            self.db.rollback()
+            await self.db.rollback()
             self.logger.error(f"Error reordering gallery images: {e}")
             return False, f"Failed to reorder gallery images: {e}"
     
     # Private helper methods
     
-    async def _get_primary_image(self, gallery_images: List[CharacterGalleryImage], character: Character) -> Dict[str, Any]:
+    def _get_primary_image(self, gallery_images: List[CharacterGalleryImage], character: Character) -> Dict[str, Any]:
         """Get the primary/default image for character"""
         # Look for primary image in gallery
         primary_image = next((img for img in gallery_images if img.is_primary), None)
         
         if primary_image:
-            return await self._format_gallery_image(primary_image)
+            return self._format_gallery_image(primary_image)
         
         # Fallback to first gallery image
         if gallery_images:
-            return await self._format_gallery_image(gallery_images[0])
+            return self._format_gallery_image(gallery_images[0])
         
         # Final fallback to character avatar_url
         if character.avatar_url:
@@ -389,7 +484,7 @@ class CharacterGalleryService:
             "is_gallery_image": False
         }
     
-    async def _format_gallery_image(self, gallery_image: CharacterGalleryImage) -> Dict[str, Any]:
+    def _format_gallery_image(self, gallery_image: CharacterGalleryImage) -> Dict[str, Any]:
         """Format gallery image for API response"""
         return {
             "id": gallery_image.id,
@@ -406,72 +501,70 @@ class CharacterGalleryService:
             "is_gallery_image": True
         }
     
-    async def _get_image_categories(self, gallery_images: List[CharacterGalleryImage]) -> List[str]:
-        """Get unique categories from gallery images"""
-        categories = list(set(img.category for img in gallery_images if img.category))
-        return sorted(categories) if categories else ["general"]
-    
-    async def _unset_primary_images(self, character_id: int):
+    async def _unset_primary_images(self, character_id: int, now: datetime):
         """Unset all primary images for a character"""
-        self.db.query(CharacterGalleryImage).filter(
-            and_(
-                CharacterGalleryImage.character_id == character_id,
-                CharacterGalleryImage.is_primary == True
-            )
-        ).update({"is_primary": False, "updated_at": datetime.utcnow()})
-    
-    async def _get_next_display_order(self, character_id: int) -> int:
-        """Get the next display order number for a character's gallery"""
-        max_order = self.db.query(CharacterGalleryImage.display_order).filter(
-            and_(
-                CharacterGalleryImage.character_id == character_id,
-                CharacterGalleryImage.is_active == True
-            )
-        ).order_by(desc(CharacterGalleryImage.display_order)).first()
-        
-        return (max_order[0] + 1) if max_order and max_order[0] is not None else 0
+        await self.db.execute(
+            update(CharacterGalleryImage).where(
+                and_(
+                    CharacterGalleryImage.character_id == character_id,
+                    CharacterGalleryImage.is_primary == True
+                )
+            ).values(is_primary=False, updated_at=now)
+        )
     
-    async def _update_character_gallery_stats(self, character_id: int):
-        """Update character gallery statistics"""
-        # Count active images
-        active_images_count = self.db.query(CharacterGalleryImage).filter(
-            and_(
-                CharacterGalleryImage.character_id == character_id,
-                CharacterGalleryImage.is_active == True
-            )
-        ).count()
-        
-        # Get primary image URL
-        primary_image = self.db.query(CharacterGalleryImage).filter(
-            and_(
-                CharacterGalleryImage.character_id == character_id,
-                CharacterGalleryImage.is_primary == True,
-                CharacterGalleryImage.is_active == True
-            )
-        ).first()
-        
-        # Update character record
-        character = self.db.query(Character).filter(Character.id == character_id).first()
-        if character:
-            character.gallery_images_count = active_images_count
-            character.gallery_enabled = active_images_count > 0
-            character.gallery_primary_image = primary_image.image_url if primary_image else None
-            character.gallery_updated_at = datetime.utcnow()
+    async def _update_character_gallery_stats(self, character_id: int, now: datetime):
+        """
+        Update character gallery statistics
+
+        Counts and the primary URL are computed by subqueries inside a single
+        UPDATE; the caller commits it together with its own changes. `now` is
+        the caller's timestamp, so the image and character rows agree.
+        """
+        # Pending image changes must be visible to the subqueries
+        await self.db.flush()
+
+        active = and_(
+            CharacterGalleryImage.character_id == character_id,
+            CharacterGalleryImage.is_active == True
+        )
+        active_images_count = select(func.count(CharacterGalleryImage.id)).where(active).scalar_subquery()
+        primary_image_url = select(CharacterGalleryImage.image_url).where(
+            and_(active, CharacterGalleryImage.is_primary == True)
+        ).limit(1).scalar_subquery()
 
-            self.db.commit()
+        await self.db.execute(
+            update(Character)
+            .where(Character.id == character_id)
+            .values(
+                gallery_images_count=active_images_count,
+                gallery_enabled=exists().where(active),
+                gallery_primary_image=primary_image_url,
+                gallery_updated_at=now
+            )
+        )
     
     async def get_gallery_stats(self) -> Dict[str, Any]:
         """Get overall gallery statistics"""
         try:
             # Total characters with galleries
-            characters_with_galleries = self.db.query(Character).filter(
-                Character.gallery_enabled == True
-            ).count()
+            characters_with_galleries = (await self.db.execute(
+                select(func.count()).select_from(Character).where(Character.gallery_enabled == True)
+            )).scalar_one()
+            
+            # Categories distribution, aggregated in the database
+            category_stats = {}
+            rows = (await self.db.execute(
+                select(CharacterGalleryImage.category, func.count()).where(
+                    CharacterGalleryImage.is_active == True
+                ).group_by(CharacterGalleryImage.category)
+            )).all()
+            
+            for category, count in rows:
+                cat_name = category or 'general'
+                category_stats[cat_name] = category_stats.get(cat_name, 0) + count
             
             # Total gallery images
-            total_images = self.db.query(CharacterGalleryImage).filter(
-                CharacterGalleryImage.is_active == True
-            ).count()
+            total_images = sum(category_stats.values())
             
             # Average images per character
             avg_images_per_character = round(
@@ -479,16 +572,6 @@ class CharacterGalleryService:
                 2
             )
             
-            # Categories distribution
-            category_stats = {}
-            categories = self.db.query(CharacterGalleryImage.category).filter(
-                CharacterGalleryImage.is_active == True
-            ).all()
-            
-            for category in categories:
-                cat_name = category[0] or 'general'
-                category_stats[cat_name] = category_stats.get(cat_name, 0) + 1
-            
             return {
                 "characters_with_galleries": characters_with_galleries,
                 "total_gallery_images": total_images,
@@ -12,6 +12,7 @@ Features:
 - Integration with AI service for character enhancement (future)
 """
 
+import importlib
 import json
 from typing import List, Optional, Tuple, Dict, Any
 from sqlalchemy.orm import Session
@@ -23,6 +24,18 @@ from utils.character_utils import transform_character_to_response, transform_cha
 from .storage_manager import get_storage_manager, StorageManagerError
 from .ai_model_manager import AIModelManager
 from .character_state_manager import CharacterStateManager
+from .prompt_engine import invalidate_character
+
+
+# Legacy character-file modules resolved by module path; each is imported once
+_character_module_cache: Dict[str, Any] = {}
+
+
+def _load_character_module(module_path: str) -> Any:
+    module = _character_module_cache.get(module_path)
+    if module is None:
+        module = _character_module_cache[module_path] = importlib.import_module(module_path)
+    return module
 
 
 class CharacterServiceError(Exception):
@@ -563,6 +576,7 @@ class CharacterService:
 
             self.db.commit()
             self.db.refresh(character)
+            invalidate_character(character.id)
             
             # Transform for API response
             response_data = transform_character_to_response(character)
@@ -627,6 +641,7 @@ class CharacterService:
             # Delete the character (commit first, then cleanup files)
             self.db.delete(character)
             self.db.commit()
+            invalidate_character(character_id)
             # Cleanup files after successful commit to avoid orphaning DB on cleanup failures
             try:
                 await self._cleanup_character_files(character)
@@ -799,6 +814,7 @@ class CharacterService:
             
             self.db.commit()
             self.db.refresh(character)
+            invalidate_character(character.id)
             
             # Transform for API response
             response_data = transform_character_to_response(character)
@@ -843,6 +859,7 @@ class CharacterService:
             # Now delete the character (commit first, then cleanup files)
             self.db.delete(character)
             self.db.commit()
+            invalidate_character(character_id)
             try:
                 await self._cleanup_character_files(character)
             except Exception as fs_err:
@@ -987,8 +1004,7 @@ class CharacterService:
         """
         try:
             # Import the character module
-            import importlib
-            module = importlib.import_module(module_path)
+            module = _load_character_module(module_path)
             
             # Extract metadata from file
             character_data = {
@@ -1034,8 +1050,7 @@ class CharacterService:
         """
         try:
             # Import the character module
-            import importlib
-            module = importlib.import_module(module_path)
+            module = _load_character_module(module_path)
             
             # Check if any metadata needs updating
             updates_made = False
@@ -1109,8 +1124,7 @@ class CharacterService:
                     db_char.name = new_name
                     
                     # Update other metadata from the .py file
-                    import importlib
-                    module = importlib.import_module(potential_match["module_path"])
+                    module = _load_character_module(potential_match["module_path"])
                     
                     # Update metadata from file
                     if hasattr(module, 'CHARACTER_GENDER'):
@@ -1151,8 +1165,6 @@ class CharacterService:
             Dict with name and module_path if match found, None otherwise
         """
         try:
-            import importlib
-            
             for char_name, module_path in discovered_characters.items():
                 # Skip if this discovered character already exists in database
                 if self.db.query(Character).filter(Character.name == char_name).first():
@@ -1160,7 +1172,7 @@ class CharacterService:
                 
                 # Load the module to check metadata
                 try:
-                    module = importlib.import_module(module_path)
+                    module = _load_character_module(module_path)
                     
                     # Heuristic 1: Check if gender matches
                     file_gender = getattr(module, 'CHARACTER_GENDER', None)
@@ -26,7 +26,7 @@ import os
 from models import Character, ChatMessage
 from .ai_service_base import AIServiceBase, AIServiceError
 from utils.prompt_selector import select_system_prompt
-from .prompt_engine import PromptEngine
+from .prompt_engine import compile_cached
 from prompts.opening_line import build_opening_line_prompt
 from prompts.state_initialization import (
     STATE_KEYS as NSFW_STATE_KEYS,
@@ -46,6 +46,10 @@ QUANTIFIABLE_KEYS = {"情绪", "好感度", "信任度", "兴奋度", "疲惫度
 class GeminiService(AIServiceBase):
     """Simplified Gemini service with clean architecture (post-Issue #129)"""
 
+    cost_per_1k = 0.0004
+    p50_latency_ms = 800.0
+    quality_score = 0.75
+
     def __init__(self, api_key: Optional[str] = None):
         """Initialize Gemini service"""
         default_model = "gemini-2.0-flash-001"
@@ -68,7 +72,7 @@ class GeminiService(AIServiceBase):
             return True
 
         except Exception as e:
-            self.logger.error(f"❌ Failed to initialize Gemini client: {e}")
+            self.logger.error("❌ Failed to initialize Gemini client: %s", e)
             self.client = None
             return False
 
@@ -103,10 +107,10 @@ class GeminiService(AIServiceBase):
             # Get character prompt using PromptEngine (unified path for all characters)
             character_prompt = self._get_character_prompt(character, chat_language=target_language)
 
-            self.logger.info(f"🎭 Generating response for character: {character.name if character else 'default'}")
+            self.logger.info("🎭 Generating response for character: %s", character.name if character else 'default')
 
             # Manage conversation length to stay within token limits
-            managed_messages = self._manage_conversation_length(messages)
+            managed_messages = self._manage_conversation_length(self._dedupe_messages(messages))
 
             # Detect sexual activity stage for targeted user-agency protection
             stage = await self._detect_user_intent_background(managed_messages)
@@ -122,7 +126,7 @@ class GeminiService(AIServiceBase):
 
             # Get selected system prompt (SAFE vs NSFW)
             selected_system_prompt, prompt_type = select_system_prompt(character)
-            self.logger.info(f"🧭 Using {prompt_type} system prompt")
+            self.logger.info("🧭 Using %s system prompt", prompt_type)
 
             # Build system instruction
             system_instruction = f"{selected_system_prompt}\n\n{character_prompt}"
@@ -167,12 +171,12 @@ class GeminiService(AIServiceBase):
             raise AIServiceError("Empty response from Gemini")
 
         except Exception as e:
-            self.logger.error(f"❌ Error generating Gemini response: {e}")
+            self.logger.error("❌ Error generating Gemini response: %s", e)
             raise AIServiceError(str(e))
 
     async def generate_opening_line(self, character: Character) -> str:
         """Generate an opening line for a character"""
-        self.logger.info(f"🚀 Generating opening line for character: {character.name}")
+        self.logger.info("🚀 Generating opening line for character: %s", character.name)
 
         fallback_line = (
             f"你好，我是{character.name}，期待与你开始这段故事。"
@@ -210,7 +214,7 @@ class GeminiService(AIServiceBase):
             raise AIServiceError("Empty response from Gemini for opening line")
 
         except Exception as e:
-            self.logger.error(f"❌ Error generating opening line: {e}")
+            self.logger.error("❌ Error generating opening line: %s", e)
             raise AIServiceError(str(e))
 
     async def generate_speech(
@@ -281,7 +285,7 @@ class GeminiService(AIServiceBase):
             return wav_bytes
 
         except Exception as e:
-            self.logger.error(f"❌ Error generating Gemini speech: {e}")
+            self.logger.error("❌ Error generating Gemini speech: %s", e)
             raise AIServiceError(str(e))
 
     @staticmethod
@@ -397,7 +401,7 @@ class GeminiService(AIServiceBase):
                 self.logger.warning("⚠️ Empty response when generating state seed; using fallback")
 
         except Exception as exc:
-            self.logger.error(f"❌ Error generating state seed: {exc}")
+            self.logger.error("❌ Error generating state seed: %s", exc)
 
         return fallback_state
 
@@ -419,13 +423,11 @@ class GeminiService(AIServiceBase):
         try:
             # Use PromptEngine for all characters
             selected_system_prompt, _ = select_system_prompt(character)
-            engine = PromptEngine(system_prompt=selected_system_prompt)
-            user_prefs = {"chat_language": chat_language} if chat_language else None
-            compiled = engine.compile(character, user_prefs=user_prefs)
+            compiled = compile_cached(character, selected_system_prompt, chat_language)
 
             # Extract persona text from compiled result
             persona_source = compiled['used_fields'].get('persona_source', 'unknown')
-            self.logger.info(f"📝 Character prompt source: {persona_source}")
+            self.logger.info("📝 Character prompt source: %s", persona_source)
 
             # Return the assembled system text (without the system_header which is already in selected_system_prompt)
             sections = compiled.get('sections', {})
@@ -441,7 +443,7 @@ class GeminiService(AIServiceBase):
             return '\n\n'.join(persona_parts) if persona_parts else ""
 
         except Exception as e:
-            self.logger.error(f"Error getting character prompt: {e}")
+            self.logger.error("Error getting character prompt: %s", e)
             # Fallback to basic character info
             return f"角色设定：\n你是{character.name}。{character.backstory or character.description or ''}"
 
@@ -457,25 +459,13 @@ class GeminiService(AIServiceBase):
         if len(messages) <= max_messages:
             return messages
 
-        # Preserve character establishment (first few messages)
-        establishment_messages = messages[:3]
-
-        # Keep recent context
-        recent_messages = messages[-(max_messages-3):]
-
-        self.logger.info(f"📏 Conversation length management: {len(messages)} -> {len(establishment_messages + recent_messages)} messages")
-        return establishment_messages + recent_messages
+        # Preserve character establishment (first few messages) plus recent context
+        keep_head = self._ESTABLISHMENT_COUNT
+        managed = [*messages[:keep_head], *messages[-(max_messages - keep_head):]]
 
-    def _extract_character_name(self, character: Optional[Character]) -> str:
-        """Extract character name for conversation history formatting"""
-        if character and character.name:
-            # Sanitize character name to prevent prompt injection
-            import re
-            sanitized_name = re.sub(r'[^\w\s\u4e00-\u9fff]', '', character.name)
-            return sanitized_name[:50]  # Limit length
-
-        # Fallback to generic name
-        return "AI助手"
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("📏 Conversation length management: %s -> %s messages", len(messages), len(managed))
+        return managed
 
     def _remove_character_name_prefix(self, text: str, character: Optional[Character]) -> str:
         """Remove character name prefix if LLM echoed it from the prompt"""
@@ -493,7 +483,7 @@ class GeminiService(AIServiceBase):
         cleaned = re.sub(pattern, '', text, count=1)
 
         if cleaned != text:
-            self.logger.debug(f"🧹 Removed character name prefix from response")
+            self.logger.debug("🧹 Removed character name prefix from response")
 
         return cleaned
 
@@ -507,7 +497,7 @@ class GeminiService(AIServiceBase):
                 self._intent_service = NSFWIntentService(gemini_client=self.client)
                 self.logger.info("🎯 NSFWIntentService initialized for this conversation")
             except (ImportError, Exception) as e:
-                self.logger.warning(f"⚠️ Intent service unavailable: {e}")
+                self.logger.warning("⚠️ Intent service unavailable: %s", e)
                 return None
         return self._intent_service
 
@@ -525,7 +515,7 @@ class GeminiService(AIServiceBase):
             else:
                 return None
         except Exception as e:
-            self.logger.warning(f"⚠️ Stage detection failed: {e}")
+            self.logger.warning("⚠️ Stage detection failed: %s", e)
             return None  # Graceful fallback - conversation continues without stage reminder
 
     def _build_intent_guidance(self, stage: str, language: Optional[str] = None) -> str:
@@ -690,13 +680,13 @@ class GeminiService(AIServiceBase):
         state_prefix = labels["state_prefix"]
 
         # Build natural conversation history
-        conversation_history = ""
-
-        for message in messages:
-            if message.role == 'user':
-                conversation_history += f"{user_label}: {message.content}\n"
-            elif message.role == 'assistant':
-                conversation_history += f"{character_name}: {message.content}\n"
+        speaker_labels = {'user': user_label, 'assistant': character_name}
+        roles, contents = self._as_soa(messages)
+        conversation_history = "".join(
+            f"{speaker_labels[role]}: {content}\n"
+            for role, content in zip(roles, contents)
+            if role in speaker_labels
+        )
 
         # Build context sections
         stage_reminder = ""
@@ -723,9 +713,9 @@ class GeminiService(AIServiceBase):
             full_prompt = f"{stage_reminder}{state_context}{character_name}:"
 
         if stage_reminder:
-            self.logger.info(f"💬 Conversation prompt with stage reminder: {len(messages)} messages for {character_name}, stage '{stage}'")
+            self.logger.info("💬 Conversation prompt with stage reminder: %s messages for %s, stage '%s'", len(messages), character_name, stage)
         else:
-            self.logger.info(f"💬 Conversation prompt built: {len(messages)} messages for {character_name}")
+            self.logger.info("💬 Conversation prompt built: %s messages for %s", len(messages), character_name)
 
         # Return in Gemini API format
         return [{
@@ -20,6 +20,7 @@ import logging
 import re
 from typing import Any, Dict, List, Optional, Tuple
 
+import httpx
 import openai  # xAI uses OpenAI-compatible API
 
 from models import Character, ChatMessage
@@ -31,10 +32,15 @@ logger = logging.getLogger(__name__)
 
 class GrokService(AIServiceBase):
     """xAI Grok service implementation"""
+
+    cost_per_1k = 0.0005
+    p50_latency_ms = 1500.0
+    quality_score = 0.7
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
         """Initialize Grok service"""
         super().__init__("grok-3-mini", api_key)
+        self.http_client = http_client  # Shared connection pool owned by AIModelManager
         self.base_url = "https://api.x.ai/v1"  # xAI API endpoint
         
     async def initialize(self) -> bool:
@@ -47,7 +53,8 @@ class GrokService(AIServiceBase):
             # Initialize OpenAI client with xAI configuration
             self.client = openai.AsyncOpenAI(
                 api_key=self.api_key,
-                base_url=self.base_url
+                base_url=self.base_url,
+                http_client=self.http_client,
             )
             
             # Test API connection with a simple request
@@ -57,7 +64,7 @@ class GrokService(AIServiceBase):
             return True
             
         except Exception as e:
-            self.logger.error(f"❌ Failed to initialize Grok service: {e}")
+            self.logger.error("❌ Failed to initialize Grok service: %s", e)
             self.client = None
             return False
     
@@ -111,14 +118,14 @@ class GrokService(AIServiceBase):
             if character:
                 few_shot_count = len(character_prompt.get("few_shot_contents", []))
                 if self._is_hardcoded_character(character):
-                    self.logger.info(f"🎭 Grok loading hardcoded character: {character.name} with {few_shot_count} examples")
+                    self.logger.info("🎭 Grok loading hardcoded character: %s with %s examples", character.name, few_shot_count)
                 else:
-                    self.logger.info(f"🎭 Grok loading user-created character: {character.name} (few-shot: {few_shot_count})")
+                    self.logger.info("🎭 Grok loading user-created character: %s (few-shot: %s)", character.name, few_shot_count)
             else:
                 self.logger.info("🎭 Grok generating response without character context")
             
             # Manage conversation length
-            managed_messages = self._manage_conversation_length(messages)
+            managed_messages = self._manage_conversation_length(self._dedupe_messages(messages))
             
             # Build messages for Grok API
             grok_messages = self._build_grok_messages(character_prompt, managed_messages, character, state)
@@ -146,19 +153,19 @@ class GrokService(AIServiceBase):
                 if state_update:
                     token_info["state_update"] = state_update
                 
-                self.logger.info(f"✅ Grok response generated: {token_info['total_tokens']} tokens")
+                self.logger.info("✅ Grok response generated: %s tokens", token_info['total_tokens'])
                 return response_text, token_info
             else:
                 self.logger.warning("⚠️ Empty response from Grok, using fallback")
                 return self._simulate_response(character, messages), {"tokens_used": 1}
                 
         except Exception as e:
-            self.logger.error(f"❌ Error generating Grok response: {e}")
+            self.logger.error("❌ Error generating Grok response: %s", e)
             return self._simulate_response(character, messages), {"tokens_used": 1}
     
     async def generate_opening_line(self, character: Character) -> str:
         """Generate opening line for character using Grok"""
-        self.logger.info(f"🚀 Grok generating opening line for: {character.name}")
+        self.logger.info("🚀 Grok generating opening line for: %s", character.name)
         
         if not self.is_available:
             return f"Hello! I'm {character.name}. {character.backstory[:100] if character.backstory else 'Nice to meet you!'}..."
@@ -186,14 +193,14 @@ class GrokService(AIServiceBase):
             
             if response and response.choices and response.choices[0].message:
                 opening_line = response.choices[0].message.content.strip()
-                self.logger.info(f"✅ Grok opening line generated for {character.name}")
+                self.logger.info("✅ Grok opening line generated for %s", character.name)
                 return opening_line
             else:
                 self.logger.warning("⚠️ Empty opening line response from Grok")
                 return f"Hello! I'm {character.name}. {character.backstory[:100] if character.backstory else 'Nice to meet you!'}..."
                 
         except Exception as e:
-            self.logger.error(f"❌ Error generating Grok opening line: {e}")
+            self.logger.error("❌ Error generating Grok opening line: %s", e)
             return f"Hello! I'm {character.name}. {character.backstory[:100] if character.backstory else 'Nice to meet you!'}..."
     
     def _build_grok_messages(
@@ -241,12 +248,12 @@ class GrokService(AIServiceBase):
                             self._parse_few_shot_to_messages(part["text"], grok_messages, character)
         
         # Add conversation history
-        character_name = self._extract_character_name(character)
-        for message in messages:
-            if message.role == 'user':
-                grok_messages.append({"role": "user", "content": message.content})
-            elif message.role == 'assistant':
-                grok_messages.append({"role": "assistant", "content": message.content})
+        roles, contents = self._as_soa(messages)
+        grok_messages.extend(
+            {"role": role, "content": content}
+            for role, content in zip(roles, contents)
+            if role == 'user' or role == 'assistant'
+        )
         
         return grok_messages
     
@@ -265,7 +272,7 @@ class GrokService(AIServiceBase):
         # Add base system prompt selected via SAFE/NSFW toggle
         try:
             selected_system_prompt, prompt_type = select_system_prompt(character)  # defaults to SAFE when character is None
-            self.logger.info(f"🧭 Grok using {prompt_type} system prompt")
+            self.logger.info("🧭 Grok using %s system prompt", prompt_type)
             system_parts.append(selected_system_prompt)
         except Exception:
             # Fallback to original NSFW system prompt if selection fails
@@ -10,6 +10,7 @@ import os
 import re
 from typing import Any, Dict, List, Optional, Tuple
 
+import httpx
 import openai
 
 from models import Character, ChatMessage
@@ -25,9 +26,14 @@ MAX_LOG_RESPONSE_CHARS = 1000
 class OpenAIService(AIServiceBase):
     """OpenAI GPT service implementation."""
 
-    def __init__(self, api_key: Optional[str] = None):
+    cost_per_1k = 0.002
+    p50_latency_ms = 2500.0
+    quality_score = 0.85
+
+    def __init__(self, api_key: Optional[str] = None, http_client: Optional[httpx.AsyncClient] = None):
         """Initialize OpenAI service."""
         super().__init__("gpt-5-mini", api_key)
+        self.http_client = http_client  # Shared connection pool owned by AIModelManager
 
     async def initialize(self) -> bool:
         """Initialize OpenAI client."""
@@ -36,11 +42,11 @@ class OpenAIService(AIServiceBase):
                 self.logger.warning("No OpenAI API key provided. OpenAI service unavailable.")
                 return True
 
-            self.client = openai.AsyncOpenAI(api_key=self.api_key)
+            self.client = openai.AsyncOpenAI(api_key=self.api_key, http_client=self.http_client)
             self.logger.info("OpenAI service initialized successfully")
             return True
         except Exception as e:
-            self.logger.error(f"Failed to initialize OpenAI service: {e}")
+            self.logger.error("Failed to initialize OpenAI service: %s", e)
             self.client = None
             return False
 
@@ -69,7 +75,7 @@ class OpenAIService(AIServiceBase):
                 chat_language = user_preferences["chat_language"]
 
             character_prompt = self._get_character_prompt(character, chat_language=chat_language)
-            managed_messages = self._manage_conversation_length(messages)
+            managed_messages = self._manage_conversation_length(self._dedupe_messages(messages))
             openai_input = self._build_openai_input(
                 character_prompt,
                 managed_messages,
@@ -77,6 +83,9 @@ class OpenAIService(AIServiceBase):
                 state,
             )
             generation_config = self._build_generation_config(user_preferences)
+            if character_prompt.get("use_cache") and character_prompt.get("cache_key"):
+                # Route requests sharing the character system prefix to the same prompt cache
+                generation_config.setdefault("extra_body", {})["prompt_cache_key"] = character_prompt["cache_key"]
 
             if not hasattr(self.client, "responses"):
                 raise AIServiceError("OpenAI responses API not available in client")
@@ -123,7 +132,7 @@ class OpenAIService(AIServiceBase):
             return response_text, token_info
 
         except Exception as e:
-            self.logger.error(f"Error generating OpenAI response: {e}")
+            self.logger.error("Error generating OpenAI response: %s", e)
             raise AIServiceError(str(e))
 
     async def generate_opening_line(self, character: Character) -> str:
@@ -158,7 +167,7 @@ class OpenAIService(AIServiceBase):
             raise AIServiceError("Empty opening line from OpenAI")
 
         except Exception as e:
-            self.logger.error(f"Error generating OpenAI opening line: {e}")
+            self.logger.error("Error generating OpenAI opening line: %s", e)
             raise AIServiceError(str(e))
 
     def _build_openai_input(
@@ -181,11 +190,12 @@ class OpenAIService(AIServiceBase):
             if state_json:
                 openai_messages.append({"role": "system", "content": f"[当前状态: {state_json}]"})
 
-        for message in messages:
-            if message.role == "user":
-                openai_messages.append({"role": "user", "content": message.content})
-            elif message.role == "assistant":
-                openai_messages.append({"role": "assistant", "content": message.content})
+        roles, contents = self._as_soa(messages)
+        openai_messages.extend(
+            {"role": role, "content": content}
+            for role, content in zip(roles, contents)
+            if role == "user" or role == "assistant"
+        )
 
         return openai_messages
 
@@ -212,7 +222,7 @@ class OpenAIService(AIServiceBase):
 
         try:
             selected_system_prompt, prompt_type = select_system_prompt(character)
-            self.logger.info(f"OpenAI using {prompt_type} system prompt")
+            self.logger.info("OpenAI using %s system prompt", prompt_type)
             system_parts.append(selected_system_prompt)
         except Exception:
             system_parts.append(SYSTEM_PROMPT)
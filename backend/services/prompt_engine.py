@@ -7,11 +7,17 @@ upstream by AI services (Issue #156) - this engine only composes persona section
 """
 
 import logging
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Tuple
 from models import Character, ChatMessage
 
 logger = logging.getLogger(__name__)
 
+# Compiled persona prompts keyed by character id plus every field compile() reads,
+# so an edited character can never be served a stale prompt.
+COMPILE_CACHE_MAXSIZE = 512
+_compile_cache: "OrderedDict[Tuple[Any, ...], Dict[str, Any]]" = OrderedDict()
+
 
 class PromptEngine:
     """
@@ -97,7 +103,7 @@ class PromptEngine:
             }
             
         except Exception as e:
-            logger.error(f"PromptEngine compilation failed: {e}")
+            logger.error("PromptEngine compilation failed: %s", e)
             # Return safe fallback
             return self._create_fallback_response(character, str(e))
     
@@ -108,19 +114,20 @@ class PromptEngine:
         Returns:
             (persona_text, source) where source is 'persona_prompt' or 'backstory'
         """
-        if character.persona_prompt and character.persona_prompt.strip():
+        # Read and strip each field once
+        persona_text = (character.persona_prompt or "").strip()
+        if persona_text:
             # Validate persona_prompt length
-            persona_text = character.persona_prompt.strip()
             if len(persona_text) > self.max_persona_chars:
-                logger.warning(f"Persona prompt truncated from {len(persona_text)} to {self.max_persona_chars} chars")
+                logger.warning("Persona prompt truncated from %s to %s chars", len(persona_text), self.max_persona_chars)
                 persona_text = persona_text[:self.max_persona_chars]
             
             return persona_text, "persona_prompt"
         else:
             # Fall back to backstory
-            persona_text = character.backstory.strip() if character.backstory else ""
+            persona_text = (character.backstory or "").strip()
             if len(persona_text) > self.max_persona_chars:
-                logger.warning(f"Backstory truncated from {len(persona_text)} to {self.max_persona_chars} chars")
+                logger.warning("Backstory truncated from %s to %s chars", len(persona_text), self.max_persona_chars)
                 persona_text = persona_text[:self.max_persona_chars]
                 
             return persona_text, "backstory"
@@ -266,6 +273,49 @@ If the user writes in a different language, STILL respond entirely in {target_la
         }
 
 
+def compile_cached(
+    character: Character,
+    system_prompt: str = "",
+    chat_language: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Compile a character prompt without chat context, memoizing the result.
+
+    The returned dict is shared between calls and must be treated as read-only.
+    Characters without an id (unsaved) are compiled without caching.
+    """
+    user_prefs = {"chat_language": chat_language} if chat_language else None
+    if character.id is None:
+        return PromptEngine(system_prompt=system_prompt).compile(character, user_prefs=user_prefs)
+
+    key = (
+        character.id,
+        character.name,
+        character.persona_prompt,
+        character.backstory,
+        character.gender,
+        system_prompt,
+        chat_language,
+    )
+    compiled = _compile_cache.get(key)
+    if compiled is not None:
+        _compile_cache.move_to_end(key)
+        return compiled
+
+    compiled = PromptEngine(system_prompt=system_prompt).compile(character, user_prefs=user_prefs)
+    if compiled.get("used_fields", {}).get("persona_source") != "fallback":
+        _compile_cache[key] = compiled
+        if len(_compile_cache) > COMPILE_CACHE_MAXSIZE:
+            _compile_cache.popitem(last=False)
+    return compiled
+
+
+def invalidate_character(character_id: int) -> None:
+    """Drop cached compiled prompts for a character (call after edits/deletes)."""
+    for key in [key for key in _compile_cache if key[0] == character_id]:
+        del _compile_cache[key]
+
+
 def create_prompt_preview(
     character: Character, 
     sample_chat: Optional[List[ChatMessage]] = None,
@@ -288,8 +338,8 @@ def create_prompt_preview(
     result["preview_info"] = {
         "character_name": character.name,
         "persona_source": result["used_fields"]["persona_source"],
-        "has_persona_prompt": bool(character.persona_prompt and character.persona_prompt.strip()),
-        "has_backstory": bool(character.backstory and character.backstory.strip()),
+        "has_persona_prompt": bool((character.persona_prompt or "").strip()),
+        "has_backstory": bool((character.backstory or "").strip()),
         "generated_at": "now"
     }
     
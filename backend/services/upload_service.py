@@ -16,7 +16,10 @@ Features:
 
 from typing import Tuple, Dict, Any, Optional
 from fastapi import UploadFile, Request, HTTPException
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+import asyncio
 import logging
 import os
 import uuid
@@ -29,6 +32,52 @@ from .storage_manager import (
 )
 
 
+THUMBNAIL_MAX_SIZE = 256
+THUMBNAIL_CPU_WORKERS = min(4, os.cpu_count() or 1)
+
+# UploadService is created per request, so the thumbnail worker pool lives at
+# module level and is shared by every upload
+_thumbnail_pool: Optional[ProcessPoolExecutor] = None
+_thumbnail_pool_failed = False
+
+
+def _get_thumbnail_pool() -> Optional[ProcessPoolExecutor]:
+    """Return the thumbnail worker pool, creating it on first use (None when unavailable)."""
+    global _thumbnail_pool, _thumbnail_pool_failed
+    if _thumbnail_pool is None and not _thumbnail_pool_failed and THUMBNAIL_CPU_WORKERS > 1:
+        try:
+            _thumbnail_pool = ProcessPoolExecutor(max_workers=THUMBNAIL_CPU_WORKERS)
+        except (OSError, NotImplementedError) as e:
+            logging.getLogger(__name__).warning("Thumbnail worker processes unavailable, resizing in threads: %s", e)
+            _thumbnail_pool_failed = True
+    return _thumbnail_pool
+
+
+async def _make_thumbnail(content: bytes) -> bytes:
+    """Resize content to a thumbnail off the event loop, in a worker process when possible."""
+    global _thumbnail_pool
+    pool = _get_thumbnail_pool()
+    if pool is not None:
+        try:
+            thumb_content, _ = await asyncio.get_running_loop().run_in_executor(
+                pool, resize_image_if_needed, content, THUMBNAIL_MAX_SIZE
+            )
+            return thumb_content
+        except BrokenProcessPool as e:
+            logging.getLogger(__name__).warning("Thumbnail worker pool died, resizing in a thread: %s", e)
+            _thumbnail_pool = None
+    thumb_content, _ = await asyncio.to_thread(resize_image_if_needed, content, THUMBNAIL_MAX_SIZE)
+    return thumb_content
+
+
+def shutdown_thumbnail_pool() -> None:
+    """Stop the thumbnail worker pool (called on application shutdown)."""
+    global _thumbnail_pool
+    if _thumbnail_pool is not None:
+        _thumbnail_pool.shutdown(wait=False, cancel_futures=True)
+        _thumbnail_pool = None
+
+
 class UploadServiceError(Exception):
     """Upload service specific errors"""
     pass
@@ -211,7 +260,7 @@ class UploadService:
 
             thumbnail_url = None
             try:
-                thumb_content, _ = resize_image_if_needed(processed_content, max_size=256)
+                thumb_content = await _make_thumbnail(processed_content)
                 if thumb_content and len(thumb_content) > 0:
                     thumb_filename = self._build_thumbnail_name(secure_filename)
                     thumb_path = self._build_storage_path(upload_type, thumb_filename, character_id)
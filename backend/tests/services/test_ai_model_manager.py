@@ -0,0 +1,250 @@
+import asyncio
+import functools
+
+import pytest
+
+from backend.services.ai_model_manager import AIModelManager, ModelProvider, ModelStatus, _is_retryable
+from backend.services.rate_limiter import AsyncTokenBucket
+
+
+class StubService:
+    def __init__(
+        self,
+        name: str,
+        available: bool = True,
+        cost_per_1k: float = 0.001,
+        p50_latency_ms: float = 1000.0,
+        quality_score: float = 0.7,
+    ):
+        self._name = name
+        self.is_available = available
+        self.cost_per_1k = cost_per_1k
+        self.p50_latency_ms = p50_latency_ms
+        self.quality_score = quality_score
+
+    @property
+    def service_name(self) -> str:
+        return self._name
+
+
+def _manager_with(*providers: ModelProvider) -> AIModelManager:
+    manager = AIModelManager()
+    for provider in providers:
+        manager.services[provider] = StubService(provider.value)
+        manager._set_service_status(provider, ModelStatus.AVAILABLE)
+    return manager
+
+
+def test_routing_helpers_are_synchronous():
+    assert not asyncio.iscoroutinefunction(AIModelManager._select_model)
+    assert not asyncio.iscoroutinefunction(AIModelManager._is_model_available)
+    assert not asyncio.iscoroutinefunction(AIModelManager._get_fallback_model)
+
+
+def test_select_model_cache_is_invalidated_by_admin_changes():
+    manager = _manager_with(ModelProvider.GEMINI, ModelProvider.GROK)
+
+    assert manager._select_model() == ModelProvider.GEMINI
+
+    manager.set_default_model(ModelProvider.GROK)
+    assert manager._select_model() == ModelProvider.GROK
+
+    manager.set_model_enabled(ModelProvider.GROK, False)
+    assert manager._select_model() == ModelProvider.GEMINI
+
+
+def test_fallback_prefers_grok_then_enabled_order():
+    manager = _manager_with(ModelProvider.GEMINI, ModelProvider.GROK, ModelProvider.OPENAI)
+
+    assert manager._get_fallback_model(ModelProvider.GEMINI) == ModelProvider.GROK
+    assert manager._get_fallback_model(ModelProvider.GROK) == ModelProvider.GEMINI
+
+    manager.set_model_enabled(ModelProvider.GROK, False)
+    assert manager._get_fallback_model(ModelProvider.GEMINI) == ModelProvider.OPENAI
+
+
+def test_model_status_snapshot_tracks_admin_changes():
+    manager = _manager_with(ModelProvider.GEMINI)
+
+    first = manager.get_model_status()
+    assert manager.get_model_status() is first
+    assert first["gemini"]["is_default"] is True
+
+    manager.set_default_model(ModelProvider.GROK)
+    refreshed = manager.get_model_status()
+    assert refreshed is not first
+    assert refreshed["gemini"]["is_default"] is False
+    assert refreshed["grok"]["is_default"] is True
+
+
+def test_model_status_snapshot_tracks_live_availability():
+    manager = _manager_with(ModelProvider.GEMINI)
+
+    first = manager.get_model_status()
+    assert first["gemini"]["is_available"] is True
+
+    manager.services[ModelProvider.GEMINI].is_available = False
+    refreshed = manager.get_model_status()
+    assert refreshed is not first
+    assert refreshed["gemini"]["is_available"] is False
+    assert manager.get_model_status() is refreshed
+
+    manager.services[ModelProvider.GEMINI].is_available = True
+    assert manager.get_model_status()["gemini"]["is_available"] is True
+
+
+def test_optimize_for_scores_available_models():
+    manager = _manager_with(ModelProvider.GEMINI, ModelProvider.GROK)
+    manager.services[ModelProvider.GEMINI] = StubService(
+        "gemini", cost_per_1k=0.004, p50_latency_ms=3000.0, quality_score=0.9
+    )
+    manager.services[ModelProvider.GROK] = StubService(
+        "grok", cost_per_1k=0.001, p50_latency_ms=500.0, quality_score=0.6
+    )
+
+    # No goal keeps the admin default
+    assert manager._select_model() == ModelProvider.GEMINI
+    assert manager._select_model(user_preferences={"optimize_for": "cost"}) == ModelProvider.GROK
+    assert manager._select_model(user_preferences={"optimize_for": "quality"}) == ModelProvider.GEMINI
+
+    # Observed latency overrides the static estimate
+    manager._record_latency(ModelProvider.GROK, 20000.0)
+    manager._select_cache.clear()
+    assert manager._select_model(user_preferences={"optimize_for": "speed"}) == ModelProvider.GEMINI
+
+
+class StatusError(Exception):
+    def __init__(self, status_code: int):
+        super().__init__(f"status {status_code}")
+        self.status_code = status_code
+
+
+def test_is_retryable_walks_wrapped_errors():
+    try:
+        try:
+            raise StatusError(503)
+        except StatusError as exc:
+            raise RuntimeError(str(exc))
+    except RuntimeError as wrapped:
+        assert _is_retryable(wrapped) is True
+
+    assert _is_retryable(asyncio.TimeoutError()) is True
+    assert _is_retryable(StatusError(400)) is False
+    assert _is_retryable(ValueError("bad input")) is False
+
+
+@pytest.mark.asyncio
+async def test_call_with_retry_only_retries_transient_errors(monkeypatch):
+    async def no_sleep(_delay):
+        return None
+
+    monkeypatch.setattr("backend.services.ai_model_manager.asyncio.sleep", no_sleep)
+    manager = _manager_with(ModelProvider.GEMINI)
+    attempts = []
+
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise StatusError(429)
+        return "ok"
+
+    assert await manager._call_with_retry(ModelProvider.GEMINI, flaky) == "ok"
+    assert len(attempts) == 2
+
+    attempts.clear()
+
+    async def invalid():
+        attempts.append(1)
+        raise StatusError(400)
+
+    with pytest.raises(StatusError):
+        await manager._call_with_retry(ModelProvider.GEMINI, invalid)
+    assert len(attempts) == 1
+
+
+class SlowLimiter:
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    async def acquire(self) -> float:
+        await asyncio.sleep(self.delay)
+        return self.delay
+
+
+@pytest.mark.asyncio
+async def test_call_provider_deadline_covers_queueing():
+    manager = _manager_with(ModelProvider.GEMINI)
+    manager._timeouts[ModelProvider.GEMINI] = 0.05
+    manager._semaphores[ModelProvider.GEMINI] = asyncio.Semaphore(1)
+    manager._rate_limiters[ModelProvider.GEMINI] = SlowLimiter(0)
+    calls = []
+
+    async def call():
+        calls.append(1)
+        return "ok"
+
+    # A held concurrency slot times the request out before it reaches upstream
+    async with manager._semaphores[ModelProvider.GEMINI]:
+        with pytest.raises(asyncio.TimeoutError):
+            await manager._call_provider(ModelProvider.GEMINI, call)
+
+    # So does a rate-limit wait longer than the provider timeout
+    manager._rate_limiters[ModelProvider.GEMINI] = SlowLimiter(1.0)
+    with pytest.raises(asyncio.TimeoutError):
+        await manager._call_provider(ModelProvider.GEMINI, call)
+    assert calls == []
+
+
+@pytest.mark.asyncio
+async def test_call_provider_latency_excludes_queueing():
+    manager = _manager_with(ModelProvider.GEMINI)
+    manager._semaphores[ModelProvider.GEMINI] = asyncio.Semaphore(1)
+    manager._rate_limiters[ModelProvider.GEMINI] = SlowLimiter(0.2)
+
+    async def call():
+        return "ok"
+
+    assert await manager._call_provider(ModelProvider.GEMINI, call) == "ok"
+    assert manager._observed_latency_ms[ModelProvider.GEMINI] < 100
+
+
+@pytest.mark.asyncio
+async def test_rate_limit_is_opt_in_and_follows_admin_changes(monkeypatch):
+    now = [0.0]
+    waits = []
+
+    async def fake_sleep(delay):
+        waits.append(delay)
+        now[0] += delay
+
+    monkeypatch.setattr(
+        "backend.services.ai_model_manager.AsyncTokenBucket",
+        functools.partial(AsyncTokenBucket, clock=lambda: now[0], sleep=fake_sleep),
+    )
+    manager = _manager_with(ModelProvider.GEMINI)
+    manager._semaphores[ModelProvider.GEMINI] = asyncio.Semaphore(10)
+
+    async def call():
+        return "ok"
+
+    async def burst(count):
+        for _ in range(count):
+            assert await manager._call_provider(ModelProvider.GEMINI, call) == "ok"
+
+    # Pacing is off by default
+    assert manager.get_admin_settings()["requests_per_minute"] is None
+    await burst(5)
+    assert waits == []
+
+    # One request per second: calls beyond the single-token burst wait
+    assert manager.set_rate_limit(60) is True
+    await burst(3)
+    assert waits == [pytest.approx(1.0), pytest.approx(1.0)]
+
+    waits.clear()
+    assert manager.set_rate_limit(0) is True
+    assert manager.get_admin_settings()["requests_per_minute"] is None
+    await burst(5)
+    assert waits == []
+
+    assert manager.set_rate_limit(-1) is False
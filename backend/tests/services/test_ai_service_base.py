@@ -0,0 +1,55 @@
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services import ai_service_base
+from backend.services.ai_service_base import AIServiceBase
+
+
+def _msg(role, content):
+    return SimpleNamespace(role=role, content=content)
+
+
+def test_dedupe_collapses_only_adjacent_repeats():
+    messages = [
+        _msg("user", "好的"),
+        _msg("user", "好的"),
+        _msg("assistant", "继续吧"),
+        _msg("user", "好的"),
+    ]
+
+    deduped = AIServiceBase._dedupe_messages(messages)
+
+    assert [(m.role, m.content) for m in deduped] == [
+        ("user", "好的"),
+        ("assistant", "继续吧"),
+        ("user", "好的"),
+    ]
+
+
+def test_dedupe_returns_same_list_when_nothing_repeats():
+    messages = [_msg("user", "hi"), _msg("assistant", "hi")]
+
+    assert AIServiceBase._dedupe_messages(messages) is messages
+
+
+def test_simulate_response_uses_character_name_when_present():
+    simulate = AIServiceBase._simulate_response
+
+    assert simulate(None, SimpleNamespace(name="艾莉丝"), []) == (
+        "*艾莉丝 正在思考中...* 抱歉，AI服务暂时不可用。请稍后再试。"
+    )
+    assert simulate(None, None, []) == "抱歉，AI服务暂时不可用。请稍后再试。"
+
+
+def test_frozen_character_prompt_is_shared_until_persona_changes():
+    ai_service_base._character_prompt_cache.clear()
+    first = ai_service_base._frozen_character_prompt(5, "safe", None, "You are Aria.")
+
+    assert ai_service_base._frozen_character_prompt(5, "safe", None, "You are Aria.") is first
+    assert first["cache_key"] == "character-5-safe-default"
+    assert first["use_cache"] is True
+    with pytest.raises(TypeError):
+        first["persona_prompt"] = "changed"
+
+    assert ai_service_base._frozen_character_prompt(5, "safe", None, "You are Bea.") is not first
@@ -0,0 +1,400 @@
+import asyncio
+import io
+from types import SimpleNamespace
+
+import pytest
+from PIL import Image
+
+from backend.services import avatar_generation_service
+from backend.services.avatar_generation_service import AvatarGenerationService
+
+
+class FakeStorage:
+    def __init__(self):
+        self.uploads = {}
+
+    async def upload(self, path, content, mimetype=None):
+        self.uploads[path] = content
+        return SimpleNamespace(path=path, public_url=f"https://cdn.test/{path}")
+
+
+def _encoded(size=(512, 512), color=(200, 10, 10), fmt="PNG") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", size, color).save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def service(monkeypatch, tmp_path):
+    storage = FakeStorage()
+    monkeypatch.setattr(avatar_generation_service, "get_storage_manager", lambda: storage)
+    # Encode in threads unless a test opts into the worker pool
+    monkeypatch.setattr(avatar_generation_service, "AVATAR_CPU_WORKERS", 1)
+    svc = AvatarGenerationService(cache_dir=tmp_path)
+    svc.generated = []
+
+    async def fake_generate(prompt):
+        svc.generated.append(prompt)
+        return _encoded()
+
+    monkeypatch.setattr(svc, "_generate_via_pollinations", fake_generate)
+    return svc
+
+
+@pytest.mark.asyncio
+async def test_identical_request_is_served_from_cache(service):
+    first = await service.generate_avatar("warrior", "Aria", gender="female", style="anime")
+    second = await service.generate_avatar("warrior ", "Bea", gender="Female", style="ANIME")
+
+    assert first[0] and second[0]
+    assert len(service.generated) == 1
+    # Each character still gets its own stored object
+    assert first[1] != second[1]
+    assert first[1].endswith(".webp")
+    assert len(service.storage.uploads) == 2
+
+
+@pytest.mark.asyncio
+async def test_regenerate_bypasses_and_refreshes_cache(service):
+    await service.generate_avatar("warrior", "Aria")
+    await service.generate_avatar("warrior", "Aria", use_cache=False)
+    await service.generate_avatar("mage", "Aria")
+
+    assert len(service.generated) == 3
+
+
+def test_cache_prunes_least_recently_used(service, monkeypatch):
+    monkeypatch.setattr(avatar_generation_service, "AVATAR_CACHE_MAX_ENTRIES", 2)
+
+    for index, key in enumerate(["a", "b", "c"]):
+        service._write_cached(key, b"png")
+        path = service.cache_dir / f"{key}{avatar_generation_service._CACHE_SUFFIX}"
+        avatar_generation_service.os.utime(path, (index, index))
+
+    service._prune_cache()
+
+    assert sorted(p.stem for p in service.cache_dir.glob("*.img")) == ["b", "c"]
+
+
+def test_process_image_center_crops_to_square(service):
+    # Left half red, right half blue, with green side bands that must be cropped away
+    image = Image.new("RGB", (1600, 1024), (0, 255, 0))
+    image.paste((255, 0, 0), (288, 0, 800, 1024))
+    image.paste((0, 0, 255), (800, 0, 1312, 1024))
+
+    processed = service._process_image(image)
+
+    assert processed.size == (512, 512)
+    assert processed.getpixel((5, 256)) == (255, 0, 0)
+    assert processed.getpixel((506, 256)) == (0, 0, 255)
+
+
+def test_encode_avatar_outputs_webp(service):
+    # Pollinations returns JPEG or PNG; every input is normalized and re-encoded
+    for source in (_encoded(fmt="JPEG"), _encoded(size=(1024, 1024))):
+        encoded = Image.open(io.BytesIO(service._encode_avatar(source)))
+        assert encoded.format == "WEBP"
+        assert encoded.size == (512, 512)
+
+
+class FakeResponse:
+    def __init__(self, payload, status=200, headers=None):
+        self.status = status
+        self._payload = payload
+        self.headers = headers or {}
+
+    async def json(self, **_kwargs):
+        return self._payload
+
+    async def read(self):
+        return self._payload
+
+    async def text(self):
+        return "error"
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    def __init__(self, payload, responses=None):
+        self.payload = payload
+        self.responses = list(responses or [])
+        self.calls = 0
+        self.urls = []
+        self.timeouts = []
+        self.closed = False
+
+    def get(self, url, timeout=None, **_kwargs):
+        self.calls += 1
+        self.urls.append(str(url))
+        self.timeouts.append(timeout.total if timeout is not None else None)
+        if self.responses:
+            return self.responses.pop(0)
+        return FakeResponse(self.payload)
+
+
+@pytest.mark.asyncio
+async def test_translations_are_cached(service):
+    session = FakeSession(b'[[["silver haired elf","\xe9\x93\xb6\xe5\x8f\x91\xe7\xb2\xbe\xe7\x81\xb5",null,null]]]')
+    service._session = session
+
+    assert await service._translate_if_chinese("银发精灵") == "silver haired elf"
+    assert await service._translate_if_chinese(" 银发精灵 ") == "silver haired elf"
+    assert await service._translate_if_chinese("plain english") == "plain english"
+    assert session.calls == 1
+    assert session.urls[0] == (
+        "https://translate.googleapis.com/translate_a/single"
+        "?client=gtx&sl=zh-CN&tl=en&dt=t&q=%E9%93%B6%E5%8F%91%E7%B2%BE%E7%81%B5"
+    )
+
+
+@pytest.mark.asyncio
+async def test_batch_uses_bounded_workers_and_keeps_order(service, monkeypatch):
+    active = 0
+    peak = 0
+
+    async def fake_generate_avatar(prompt, character_name, gender, style):
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0)
+        active -= 1
+        if character_name == "broken":
+            raise RuntimeError("boom")
+        return True, f"https://cdn.test/{character_name}", None
+
+    monkeypatch.setattr(service, "generate_avatar", fake_generate_avatar)
+    names = [f"c{i}" for i in range(10)] + ["broken"]
+
+    results = await service.generate_batch_avatars(
+        [{"character_name": name} for name in names], max_concurrent=3
+    )
+
+    assert peak == 3
+    assert [r["character_name"] for r in results] == names
+    assert all(r["success"] for r in results[:-1])
+    assert results[-1] == {"character_name": "broken", "success": False, "url": None, "error": "boom"}
+
+
+@pytest.mark.asyncio
+async def test_get_with_retry_honours_retry_after(service, monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(avatar_generation_service.asyncio, "sleep", fake_sleep)
+    service._session = FakeSession(
+        b"image",
+        responses=[
+            FakeResponse(None, status=429, headers={"Retry-After": "2"}),
+            FakeResponse(None, status=503),
+        ],
+    )
+
+    status, body = await service._get_with_retry("https://image.test/x", 90, lambda r: r.read())
+
+    assert (status, body) == (200, b"image")
+    assert sleeps[0] == 2.0
+    assert 2.0 <= sleeps[1] <= 3.0  # backoff for the second attempt plus jitter
+
+
+@pytest.mark.asyncio
+async def test_get_with_retry_stays_within_one_timeout(service, monkeypatch):
+    sleeps = []
+
+    async def fake_sleep(delay):
+        sleeps.append(delay)
+
+    monkeypatch.setattr(avatar_generation_service.asyncio, "sleep", fake_sleep)
+
+    # A Retry-After longer than the time left is not waited out
+    service._session = FakeSession(
+        b"image", responses=[FakeResponse(None, status=429, headers={"Retry-After": "120"})]
+    )
+    assert await service._get_with_retry("https://image.test/x", 90, lambda r: r.read()) == (429, "error")
+    assert sleeps == []
+
+    # Every attempt gets what is left of the budget, not a fresh timeout
+    service._session = FakeSession(
+        b"image", responses=[FakeResponse(None, status=503, headers={"Retry-After": "0"})]
+    )
+    assert await service._get_with_retry("https://image.test/x", 90, lambda r: r.read()) == (200, b"image")
+    first, second = service._session.timeouts
+    assert first <= 90 and second <= first
+
+
+@pytest.mark.asyncio
+async def test_get_with_retry_gives_up_on_client_errors(service, monkeypatch):
+    monkeypatch.setattr(avatar_generation_service.asyncio, "sleep", lambda _d: pytest.fail("slept"))
+    service._session = FakeSession(None, responses=[FakeResponse(None, status=400)])
+
+    assert await service._get_with_retry("https://image.test/x", 90, lambda r: r.read()) == (400, "error")
+
+
+class StreamingResponse:
+    def __init__(self, chunks, content_length, headers=None):
+        self.content_length = content_length
+        self.headers = headers or {}
+        self.content = SimpleNamespace(iter_chunked=lambda _size: self._iterate(chunks))
+
+    @staticmethod
+    async def _iterate(chunks):
+        for chunk in chunks:
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_read_image_body_fills_preallocated_buffer():
+    body = await AvatarGenerationService._read_image_body(StreamingResponse([b"abc", b"def"], 6))
+    assert body == b"abcdef"
+
+    unknown_length = await AvatarGenerationService._read_image_body(StreamingResponse([b"ab", b"c"], None))
+    assert unknown_length == b"abc"
+
+
+@pytest.mark.asyncio
+async def test_read_image_body_accepts_decompressed_bodies_longer_than_content_length():
+    # aiohttp yields the decoded body, Content-Length is the gzip size
+    gzipped = StreamingResponse([b"abcdef", b"ghij"], 4, headers={"Content-Encoding": "gzip"})
+    assert await AvatarGenerationService._read_image_body(gzipped) == b"abcdefghij"
+
+    # A wrong hint on an unencoded response only costs a resize
+    assert await AvatarGenerationService._read_image_body(StreamingResponse([b"abc", b"def"], 4)) == b"abcdef"
+    assert await AvatarGenerationService._read_image_body(StreamingResponse([b"abc"], 6)) == b"abc"
+
+
+@pytest.mark.asyncio
+async def test_read_image_body_rejects_oversized_bodies(monkeypatch):
+    too_large = avatar_generation_service.MAX_IMAGE_BYTES + 1
+    with pytest.raises(avatar_generation_service.AvatarGenerationError):
+        await AvatarGenerationService._read_image_body(StreamingResponse([], too_large))
+
+    monkeypatch.setattr(avatar_generation_service, "MAX_IMAGE_BYTES", 4)
+    encoded = StreamingResponse([b"abc", b"def"], 3, headers={"Content-Encoding": "gzip"})
+    with pytest.raises(avatar_generation_service.AvatarGenerationError):
+        await AvatarGenerationService._read_image_body(encoded)
+
+
+def test_parse_translation_joins_sentence_segments():
+    payload = b'[[["An elf archer. ","A",null,null],["She has silver hair.","B",null,null]],null,"zh-CN"]'
+
+    assert AvatarGenerationService._parse_translation(payload) == "An elf archer. She has silver hair."
+    assert AvatarGenerationService._parse_translation(b"<html>") is None
+    assert AvatarGenerationService._parse_translation(b"[]") is None
+
+
+def test_build_prompt_matches_style_and_gender(service):
+    assert service._build_prompt("with a bow", "male", "anime") == (
+        "handsome young man with a bow, anime style, manga illustration, cel shaded, vibrant colors, "
+        "detailed eyes, studio trigger style, portrait, upper body, centered composition, facing camera, "
+        "highly detailed face, expressive eyes, masterpiece, best quality, 4k, sharp focus"
+    )
+    assert service._build_prompt("", "unknown", "unknown").startswith(
+        "person character portrait, fantasy art, magical atmosphere"
+    )
+    assert service._build_prompt("  ", "Female", "Chinese") == service._build_prompt("", "female", "chinese")
+
+
+def test_process_image_flattens_alpha_onto_white(service):
+    opaque = Image.new("RGBA", (512, 512), (10, 20, 30, 255))
+    assert service._process_image(opaque).getpixel((0, 0)) == (10, 20, 30)
+
+    translucent = Image.new("RGBA", (512, 512), (0, 0, 0, 0))
+    translucent.paste((0, 0, 255, 255), (256, 0, 512, 512))
+    processed = service._process_image(translucent)
+    assert processed.mode == "RGB"
+    assert processed.getpixel((5, 256)) == (255, 255, 255)
+    assert processed.getpixel((506, 256)) == (0, 0, 255)
+
+
+@pytest.mark.asyncio
+async def test_encode_runs_in_worker_process_with_thread_fallback(service, monkeypatch):
+    monkeypatch.setattr(avatar_generation_service, "AVATAR_CPU_WORKERS", 2)
+    try:
+        encoded = await service._run_encode(_encoded(size=(1024, 768)))
+        assert service._cpu_pool is not None
+        assert Image.open(io.BytesIO(encoded)).size == (512, 512)
+    finally:
+        await service.close()
+    assert service._cpu_pool is None
+
+    monkeypatch.setattr(avatar_generation_service, "AVATAR_CPU_WORKERS", 1)
+    encoded = await service._run_encode(_encoded(size=(1024, 768)))
+    assert service._cpu_pool is None
+    assert Image.open(io.BytesIO(encoded)).size == (512, 512)
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_generation(service, monkeypatch):
+    release = asyncio.Event()
+
+    async def slow_generate(prompt):
+        service.generated.append(prompt)
+        await release.wait()
+        return _encoded()
+
+    monkeypatch.setattr(service, "_generate_via_pollinations", slow_generate)
+    pending = [
+        asyncio.ensure_future(service.generate_avatar("archer", name, style="anime"))
+        for name in ("Aria", "Bea", "Cai")
+    ]
+    await asyncio.sleep(0.05)
+    release.set()
+    results = await asyncio.gather(*pending)
+
+    assert all(success for success, _url, _error in results)
+    assert len(service.generated) == 1
+    assert len(service.storage.uploads) == 3
+    assert service._inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_pollinations_url_encodes_prompt_once(service, monkeypatch):
+    requested = []
+
+    async def fake_get(url, timeout_seconds, read_body):
+        requested.append(url)
+        return 200, bytearray(b"image")
+
+    monkeypatch.setattr(service, "_get_with_retry", fake_get)
+
+    # The fixture stubs the method on the instance; call the real one
+    body = await AvatarGenerationService._generate_via_pollinations(service, "elf, 100% silver hair")
+    assert body == b"image"
+    assert str(requested[0]) == (
+        "https://image.pollinations.ai/prompt/elf,%20100%25%20silver%20hair"
+        "?width=512&height=512&nologo=true&model=flux&enhance=true"
+    )
+
+
+class SlowResponse(FakeResponse):
+    async def read(self):
+        await asyncio.sleep(0.01)
+        return self._payload
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_translations_share_one_request(service):
+    payload = b'[[["silver haired elf","\xe9\x93\xb6\xe5\x8f\x91\xe7\xb2\xbe\xe7\x81\xb5",null,null]]]'
+    session = FakeSession(payload, responses=[SlowResponse(payload) for _ in range(3)])
+    service._session = session
+
+    results = await asyncio.gather(*(service._translate_if_chinese("银发精灵") for _ in range(3)))
+
+    assert results == ["silver haired elf"] * 3
+    assert session.calls == 1
+    assert service._translate_inflight == {}
+
+
+@pytest.mark.asyncio
+async def test_same_name_avatars_get_distinct_paths(service):
+    first = await service.generate_avatar("warrior", "Aria")
+    second = await service.generate_avatar("warrior", "Aria")
+
+    assert first[1] != second[1]
+    assert len(service.storage.uploads) == 2
@@ -0,0 +1,299 @@
+from contextlib import asynccontextmanager
+
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+# The service imports `models` directly, so the test uses the same module
+# objects rather than backend.models
+from models import Base, Character, CharacterGalleryImage, User
+from backend.services import character_gallery_service
+from backend.services.character_gallery_service import CharacterGalleryService
+
+
+@pytest.fixture(autouse=True)
+def clear_gallery_cache():
+    character_gallery_service._gallery_cache.clear()
+    yield
+    character_gallery_service._gallery_cache.clear()
+
+
+@asynccontextmanager
+async def gallery_db():
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    async with engine.begin() as conn:
+        await conn.run_sync(
+            Base.metadata.create_all,
+            tables=[User.__table__, Character.__table__, CharacterGalleryImage.__table__],
+        )
+    session = async_sessionmaker(engine, expire_on_commit=False)()
+    try:
+        session.add_all([
+            Character(id=1, name="Aria", backstory="b", voice_style="v", traits=[], avatar_url="/assets/aria.png"),
+            Character(id=2, name="Bea", backstory="b", voice_style="v", traits=[]),
+        ])
+        await session.commit()
+        yield session
+    finally:
+        await session.close()
+        await engine.dispose()
+
+
+async def _add(service, character_id, name, **kwargs):
+    success, image, error = await service.add_gallery_image(
+        character_id, {"image_url": f"/assets/{name}.png", **kwargs.pop("data", {})}, None, **kwargs
+    )
+    assert success, error
+    return image
+
+
+async def _rows(db, character_id):
+    result = await db.execute(
+        select(CharacterGalleryImage)
+        .where(CharacterGalleryImage.character_id == character_id)
+        .order_by(CharacterGalleryImage.id)
+        .execution_options(populate_existing=True)
+    )
+    return result.scalars().all()
+
+
+async def _character(db, character_id):
+    result = await db.execute(
+        select(Character).where(Character.id == character_id).execution_options(populate_existing=True)
+    )
+    return result.scalar_one()
+
+
+@pytest.mark.asyncio
+async def test_add_and_get_gallery():
+    async with gallery_db() as db:
+        service = CharacterGalleryService(db)
+        first = await _add(service, 1, "one", data={"category": "portrait"})
+        await _add(service, 1, "two", is_primary=True)
+
+        assert first["url"] == "/assets/one.png"
+        assert first["alt_text"] == "Aria gallery image"
+        assert await service.add_gallery_image(99, {"image_url": "x"}, None) == (
+            False, {}, "Character with ID 99 not found"
+        )
+
+        admin_view = await service.get_character_gallery(1)
+        assert [image["url"] for image in admin_view["images"]] == ["/assets/two.png", "/assets/one.png"]
+        assert admin_view["primary_image"]["url"] == "/assets/two.png"
+        assert admin_view["categories"] == ["general", "portrait"]
+        assert admin_view["total_images"] == 2
+
+        # User-facing view puts the character avatar first
+        user_view = await service.get_character_gallery(1, include_avatar_in_images=True)
+        assert user_view["images"][0]["url"] == "/assets/aria.png"
+        assert user_view["images"][0]["is_gallery_image"] is False
+        assert len(user_view["images"]) == 3
+
+        with pytest.raises(character_gallery_service.CharacterGalleryServiceError):
+            await service.get_character_gallery(99)
+
+
+@pytest.mark.asyncio
+async def test_primary_switch_reorder_and_delete():
+    async with gallery_db() as db:
+        service = CharacterGalleryService(db)
+        one = await _add(service, 1, "one", is_primary=True)
+        two = await _add(service, 1, "two")
+
+        assert await service.update_primary_image(1, two["id"]) == (True, None)
+        assert [row.is_primary for row in await _rows(db, 1)] == [False, True]
+        assert (await service.update_primary_image(1, 999))[0] is False
+
+        assert await service.reorder_gallery_images(
+            1, [{"image_id": one["id"], "display_order": 5}, {"image_id": two["id"], "display_order": 3}]
+        ) == (True, None)
+        assert [row.display_order for row in await _rows(db, 1)] == [5, 3]
+
+        assert await service.delete_gallery_image(1, one["id"]) == (True, None)
+        assert [row.is_active for row in await _rows(db, 1)] == [False, True]
+        assert (await service.delete_gallery_image(1, one["id"]))[0] is False
+
+        gallery = await service.get_character_gallery(1)
+        assert [image["id"] for image in gallery["images"]] == [two["id"]]
+
+
+@pytest.mark.asyncio
+async def test_gallery_stats():
+    async with gallery_db() as db:
+        service = CharacterGalleryService(db)
+        await _add(service, 1, "one", data={"category": "portrait"})
+        await _add(service, 1, "two", data={"category": "portrait"})
+        await _add(service, 2, "three")
+
+        stats = await service.get_gallery_stats()
+
+        assert stats["characters_with_galleries"] == 2
+        assert stats["total_gallery_images"] == 3
+        assert stats["average_images_per_character"] == 1.5
+        assert stats["category_distribution"] == {"portrait": 2, "general": 1}
+
+
+@pytest.mark.asyncio
+async def test_display_order_appends_after_existing_images():
+    async with gallery_db() as db:
+        service = CharacterGalleryService(db)
+        first = await _add(service, 1, "one")
+        second = await _add(service, 1, "two")
+        third = await _add(service, 1, "three")
+        other = await _add(service, 2, "other")
+
+        assert [first["display_order"], second["display_order"], third["display_order"]] == [0, 1, 2]
+        # Each character's gallery is numbered independently
+        assert other["display_order"] == 0
+
+        # Inactive images no longer count towards the next position
+        await service.delete_gallery_image(1, third["id"])
+        assert (await _add(service, 1, "four"))["display_order"] == 2
+
+
+@pytest.mark.asyncio
+async def test_primary_switch_keeps_a_single_primary():
+    async with gallery_db() as db:
+        service = CharacterGalleryService(db)
+        one = await _add(service, 1, "one", is_primary=True)
+        two = await _add(service, 1, "two")
+        three = await _add(service, 1, "three")
+        other = await _add(service, 2, "other", is_primary=True)
+
+        for image in (two, three, one):
+            assert await service.update_primary_image(1, image["id"]) == (True, None)
+            rows = await _rows(db, 1)
+            assert [row.id for row in rows if row.is_primary] == [image["id"]]
+            assert (await _character(db, 1)).gallery_primary_image == image["url"]
+
+        # Another character's primary is left alone
+        assert [row.is_primary for row in await _rows(db, 2)] == [True]
+        assert (await _character(db, 2)).gallery_primary_image == other["url"]
+
+        # Re-selecting the current primary returns early without writing
+        updated_at = (await _character(db, 1)).gallery_updated_at
+        assert await service.update_primary_image(1, one["id"]) == (True, None)
+        assert (await _character(db, 1)).gallery_updated_at == updated_at
+
+        # An image of another character cannot be made primary here
+        assert (await service.update_primary_image(1, other["id"]))[0] is False
+
+
+@pytest.mark.asyncio
+async def test_reorder_only_touches_listed_images_of_the_character():
+    async with gallery_db() as db:
+        service = CharacterGalleryService(db)
+        one = await _add(service, 1, "one")
+        two = await _add(service, 1, "two")
+        three = await _add(service, 1, "three")
+        other = await _add(service, 2, "other")
+        other_updated_at = (await _rows(db, 2))[0].updated_at
+
+        # Partial reorder, plus an id that belongs to character 2
+        assert await service.reorder_gallery_images(1, [
+            {"image_id": three["id"], "display_order": 0},
+            {"image_id": one["id"], "display_order": 7},
+            {"image_id": other["id"], "display_order": 9},
+        ]) == (True, None)
+
+        assert {row.id: row.display_order for row in await _rows(db, 1)} == {
+            one["id"]: 7, two["id"]: 1, three["id"]: 0,
+        }
+        other_row = (await _rows(db, 2))[0]
+        assert other_row.display_order == 0
+        assert other_row.updated_at == other_updated_at
+
+        gallery = await service.get_character_gallery(1)
+        assert [image["id"] for image in gallery["images"]] == [three["id"], two["id"], one["id"]]
+
+
+@pytest.mark.asyncio
+async def test_character_gallery_columns_follow_add_and_delete():
+    async with gallery_db() as db:
+        service = CharacterGalleryService(db)
+        character = await _character(db, 1)
+        assert (character.gallery_images_count, character.gallery_enabled, character.gallery_primary_image) == (
+            0, False, None
+        )
+
+        one = await _add(service, 1, "one")
+        character = await _character(db, 1)
+        assert (character.gallery_images_count, character.gallery_enabled, character.gallery_primary_image) == (
+            1, True, None
+        )
+
+        two = await _add(service, 1, "two", is_primary=True)
+        character = await _character(db, 1)
+        assert (character.gallery_images_count, character.gallery_enabled, character.gallery_primary_image) == (
+            2, True, two["url"]
+        )
+
+        # Deleting the primary clears the denormalised primary url
+        await service.delete_gallery_image(1, two["id"])
+        character = await _character(db, 1)
+        assert (character.gallery_images_count, character.gallery_enabled, character.gallery_primary_image) == (
+            1, True, None
+        )
+
+        await service.delete_gallery_image(1, one["id"])
+        character = await _character(db, 1)
+        assert (character.gallery_images_count, character.gallery_enabled, character.gallery_primary_image) == (
+            0, False, None
+        )
+
+        # Character 2 was never touched
+        assert (await _character(db, 2)).gallery_updated_at is None
+
+
+@pytest.mark.asyncio
+async def test_gallery_stats_match_per_category_counts():
+    async with gallery_db() as db:
+        service = CharacterGalleryService(db)
+        categories = {1: ["portrait", "outfit", "portrait", None, "general"], 2: ["scene", None, "outfit"]}
+        for character_id, names in categories.items():
+            for index, category in enumerate(names):
+                await _add(service, character_id, f"{character_id}-{index}", data={"category": category})
+        deleted = await _add(service, 2, "deleted", data={"category": "scene"})
+        await service.delete_gallery_image(2, deleted["id"])
+
+        expected = {}
+        for row in (await _rows(db, 1)) + (await _rows(db, 2)):
+            if row.is_active:
+                name = row.category or "general"
+                expected[name] = expected.get(name, 0) + 1
+
+        stats = await service.get_gallery_stats()
+
+        assert stats["category_distribution"] == expected == {"portrait": 2, "outfit": 2, "general": 3, "scene": 1}
+        assert stats["total_gallery_images"] == 8
+        assert stats["characters_with_galleries"] == 2
+        assert stats["average_images_per_character"] == 4.0
+
+
+@pytest.mark.asyncio
+async def test_returned_gallery_is_isolated_from_the_cache():
+    async with gallery_db() as db:
+        service = CharacterGalleryService(db)
+        await _add(service, 1, "one", is_primary=True)
+
+        first = await service.get_character_gallery(1)
+        expected = await service.get_character_gallery(1)
+        assert first == expected and first is not expected
+
+        # Mutate both the miss-path and hit-path results
+        for result in (first, expected):
+            result["total_images"] = 99
+            result["images"][0]["url"] = "/tampered.png"
+            result["primary_image"]["alt_text"] = "tampered"
+            result["categories"].append("tampered")
+
+        again = await service.get_character_gallery(1)
+        assert again["total_images"] == 1
+        assert again["images"][0]["url"] == "/assets/one.png"
+        assert again["primary_image"]["alt_text"] == "Aria gallery image"
+        assert again["categories"] == ["general"]
+        assert len(character_gallery_service._gallery_cache) == 1
@@ -0,0 +1,72 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from backend.services import prompt_engine
+from backend.services.prompt_engine import compile_cached, invalidate_character
+
+
+def _character(**overrides):
+    fields = {
+        "id": 42,
+        "name": "Persona",
+        "persona_prompt": None,
+        "backstory": "A quiet librarian.",
+        "gender": None,
+    }
+    fields.update(overrides)
+    return SimpleNamespace(**fields)
+
+
+def test_compile_cached_reuses_until_character_changes():
+    prompt_engine._compile_cache.clear()
+    character = _character()
+
+    first = compile_cached(character, "SYSTEM")
+    assert compile_cached(character, "SYSTEM") is first
+    assert "A quiet librarian." in first["system_text"]
+
+    # Edited fields produce a fresh compile even without explicit invalidation
+    character.backstory = "A retired pirate."
+    edited = compile_cached(character, "SYSTEM")
+    assert edited is not first
+    assert "A retired pirate." in edited["system_text"]
+
+    # Language is part of the key
+    assert compile_cached(character, "SYSTEM", "en") is not edited
+
+
+def test_invalidate_character_drops_only_that_character():
+    prompt_engine._compile_cache.clear()
+    compile_cached(_character(id=1), "SYSTEM")
+    compile_cached(_character(id=2), "SYSTEM")
+
+    invalidate_character(1)
+
+    assert {key[0] for key in prompt_engine._compile_cache} == {2}
+
+
+@pytest.mark.asyncio
+async def test_concurrent_burst_compiles_once(monkeypatch):
+    prompt_engine._compile_cache.clear()
+    calls = []
+    original = prompt_engine.PromptEngine.compile
+
+    def counting_compile(self, character, *args, **kwargs):
+        calls.append(character.id)
+        return original(self, character, *args, **kwargs)
+
+    monkeypatch.setattr(prompt_engine.PromptEngine, "compile", counting_compile)
+    character = _character()
+
+    async def request():
+        await asyncio.sleep(0)
+        return compile_cached(character, "SYSTEM")
+
+    results = await asyncio.gather(*(request() for _ in range(50)))
+
+    # compile_cached never awaits, so the first request fills the cache before
+    # any other coroutine resumes; no per-character lock is needed
+    assert calls == [42]
+    assert all(result is results[0] for result in results)
@@ -0,0 +1,46 @@
+import pytest
+
+from backend.services.rate_limiter import AsyncTokenBucket
+
+
+class FakeClock:
+    def __init__(self, start: float = 0.0):
+        self.value = start
+
+    def advance(self, delta: float) -> None:
+        self.value += delta
+
+    def __call__(self) -> float:
+        return self.value
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_for_refill_once_drained():
+    clock = FakeClock()
+    sleeps = []
+
+    async def fake_sleep(delay: float) -> None:
+        sleeps.append(delay)
+        clock.advance(delay)
+
+    bucket = AsyncTokenBucket(rate_per_minute=60, capacity=2, clock=clock, sleep=fake_sleep)
+
+    # Burst up to capacity without waiting
+    assert await bucket.acquire() == 0.0
+    assert await bucket.acquire() == 0.0
+
+    # Third call has to wait one refill interval (1 token/second)
+    waited = await bucket.acquire()
+    assert pytest.approx(waited, rel=0.01) == 1.0
+    assert sleeps == [pytest.approx(1.0, rel=0.01)]
+
+    # Idle time refills, but never beyond capacity
+    clock.advance(10.0)
+    assert await bucket.acquire() == 0.0
+    assert await bucket.acquire() == 0.0
+    assert await bucket.acquire() > 0.0
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        AsyncTokenBucket(rate_per_minute=0)
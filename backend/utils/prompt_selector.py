@@ -33,16 +33,13 @@ def select_system_prompt(character: Character) -> Tuple[str, str]:
         return SYSTEM_PROMPT_SAFE, "SAFE"
 
     # Binary NSFW logic: treat nsfwLevel as boolean (is_nsfw = nsfwLevel > 0)
-    is_nsfw = (character.nsfw_level or 0) > 0
-
-    if is_nsfw:
-        logger.info(f"Character '{character.name}' using NSFW system "
-                    f"prompt (nsfwLevel={character.nsfw_level})")
-        return SYSTEM_PROMPT, "NSFW"
+    if (character.nsfw_level or 0) > 0:
+        selected = SYSTEM_PROMPT, "NSFW"
     else:
-        logger.info(f"Character '{character.name}' using SAFE system "
-                    f"prompt (nsfwLevel={character.nsfw_level})")
-        return SYSTEM_PROMPT_SAFE, "SAFE"
+        selected = SYSTEM_PROMPT_SAFE, "SAFE"
+    logger.info("Character '%s' using %s system prompt (nsfwLevel=%s)",
+                character.name, selected[1], character.nsfw_level)
+    return selected
 
 
 def get_prompt_type(character: Character) -> str:
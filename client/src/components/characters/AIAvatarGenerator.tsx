@@ -55,6 +55,10 @@ const AIAvatarGenerator = ({
       formData.append('character_name', characterName);
       formData.append('gender', characterGender || 'female');
       formData.append('style', style);
+      // Repeat clicks ask for a new variation instead of the cached image
+      if (generatedAvatars.length > 0) {
+        formData.append('regenerate', 'true');
+      }
 
       const response = await apiRequest('POST', '/api/characters/generate-avatar', formData);
 